@@ -5,6 +5,7 @@ import components.matrix_component as matrix_components
 import components.setup_components as setup_components
 import components.components as components
 import utils.node_wrapper as nw
+import utils.apiundo as apiundo
 import utils.enum as utils_enum
 import utils.utils as utils
 import system.data as data
@@ -157,7 +158,7 @@ class HingeAnimComponent(AnimComponent):
         io_node = self.io_node
         motion_transform = self.transform_node
         ik_cntrl_grp = nw.Node.create_node("transform", "ikCntrlGrp")
-        cmds.parent(str(ik_cntrl_grp), str(motion_transform))
+        apiundo.run(cmds.parent, str(ik_cntrl_grp), str(motion_transform))
         io_node_hier_attr = io_node[data.HierDataAttrNames.hier.value]
 
         # setting hier attr and hier names
@@ -307,7 +308,7 @@ class HingeAnimComponent(AnimComponent):
                 if input_shape.node_type == "container":
                     container = input_shape
                 
-                component_class = utils.string_to_class(container["componentClass"].value)
+                component_class = Component.get_class(container["componentClass"].value)
                 kwargs["input_shape"] = component_class(container).transform_node
 
             control_inst = ik_inst.promote_to_control(
@@ -6,6 +6,7 @@ import components.control_components as control_components
 import components.setup_components as setup_components
 import components.anim_component as anim_components
 import utils.node_wrapper as nw
+import utils.apiundo as apiundo
 import maya.cmds as cmds
 
 import system.data as data
@@ -108,15 +109,15 @@ class CharacterComponent(Component):
         non_move_grp = nw.Node.create_node("transform", "nonMoveGrp")
         setup_grp  = nw.Node.create_node("transform", "setupGrp")
         io_node["setupGrpVisibility"] >> setup_grp["visibility"]
-        cmds.parent(str(non_move_grp), str(self.transform_node))
-        cmds.parent(str(setup_grp), str(non_move_grp))
+        apiundo.run(cmds.parent, str(non_move_grp), str(self.transform_node))
+        apiundo.run(cmds.parent, str(setup_grp), str(non_move_grp))
 
         # creating transforms
         anim_grp = nw.Node.create_node("transform", "animGrp")
         geo_grp = nw.Node.create_node("transform", "geoGrp")
         io_node["animGrpVisibility"] >> anim_grp["visibility"]
         io_node["geoGrpVisibility"] >> geo_grp["visibility"]
-        cmds.parent([str(x) for x in [geo_grp, anim_grp, self.root_cntrl_node]])
+        apiundo.run(cmds.parent, [str(x) for x in [geo_grp, anim_grp, self.root_cntrl_node]])
 
         # adding transforms
         self.container_node.add_nodes(non_move_grp, setup_grp, anim_grp, geo_grp)
@@ -3,6 +3,7 @@ import system.base_components as base_components
 import components.control_components as control_components
 import system.data as data
 import utils.node_wrapper as nw
+import utils.apiundo as apiundo
 import utils.utils as utils
 import utils.enum as utils_enum
 import maya.cmds as cmds
@@ -31,9 +32,9 @@ class ColorManager(Component):
 
         for color_enum in utils_enum.Colors:
             index_color = cmds.colorIndex(color_enum.value, q=True)
-            shader = nw.Node(cmds.shadingNode("lambert", name=color_enum.name, asShader=True))
+            shader = nw.Node(apiundo.run(cmds.shadingNode, "lambert", name=color_enum.name, asShader=True))
             shader["color"] = index_color
-            shader_sg = nw.Node(cmds.sets(name="{0}SG".format(shader), renderable=True, noSurfaceShader=True, empty=True))
+            shader_sg = nw.Node(apiundo.run(cmds.sets, name="{0}SG".format(shader), renderable=True, noSurfaceShader=True, empty=True))
 
             shader["outColor"] >> shader_sg["surfaceShader"]
 
@@ -60,7 +61,7 @@ class ColorManager(Component):
                 shape["overrideColorRGB"] = shader["color"]
 
             else:
-                cmds.sets([str(shape)], e=True, forceElement=str(shader_sg))
+                apiundo.run(cmds.sets, [str(shape)], e=True, forceElement=str(shader_sg))
 
     @classmethod
     def get_instance(cls, info=None):
@@ -379,7 +380,7 @@ class PoleVecCalcComponent(Component):
             "{} = $primaryVal * {} + $secondaryVal * {};".format(compose_matrix["inputTranslateZ"], io_node["primaryAimAxisZ"], io_node["secondaryAimAxisZ"]),   
         ]
 
-        expr_node = nw.Node(cmds.expression(string="\n".join(expr_str), name="poleOffsetExpr"))
+        expr_node = nw.Node(apiundo.run(cmds.expression, string="\n".join(expr_str), name="poleOffsetExpr"))
 
         add_nodes = [start_end_distance, start_dir_distance, dir_end_distance, 
                      aim_matrix, compose_matrix, mult_matrix, expr_node]
@@ -471,7 +472,7 @@ class HierComponent(Component):
                 input_hier_attrs[index][data.HierAttrNames.output_world_matrix.value] >> interface["hiers"][index]["worldMatrix"]
                 input_hier_attrs[index][data.HierAttrNames.output_local_matrix.value] >> interface["hiers"][index]["localMatrix"]
 
-                jnt = nw.Node(cmds.joint(name="{}_{}".format(jnt_name_pre, interface["hiers"][index]["name"].value)))
+                jnt = nw.Node(apiundo.run(cmds.joint, name="{}_{}".format(jnt_name_pre, interface["hiers"][index]["name"].value)))
                 # cmds.parent(str(jnt_parent), str(jnt), relative=False)
                 interface["hiers"][index]["localMatrix"] >> jnt["offsetParentMatrix"]
                 self.container_node.add_nodes(jnt)
@@ -479,7 +480,7 @@ class HierComponent(Component):
                 io_node["jntRadius"] >> jnt["radius"]
 
                 if index == 0:
-                    cmds.parent(str(jnt), str(jnt_parent), relative=True)
+                    apiundo.run(cmds.parent, str(jnt), str(jnt_parent), relative=True)
 
             self.container_node.add_nodes(interface)
             self.rename_nodes()
@@ -6,6 +6,7 @@ import system.data as data
 import maya.cmds as cmds
 import utils.enum as utils_enum
 import utils.utils as utils
+import utils.apiundo as apiundo
 import warnings
 
 import ast as ast
@@ -79,16 +80,16 @@ class ControlComponent(Component):
             locked_attrs.set_locked(False)
         scale = transform["scale"].value
         
-        cmds.makeIdentity(str(transform), apply=True)
+        apiundo.run(cmds.makeIdentity, str(transform), apply=True)
 
         if scale[0] * scale[1] * scale[2] < 0:
             shapes = [nw.Node(x) for x in cmds.listRelatives(str(transform), shapes=True)]
             for x in shapes:
                 if x.node_type == "nurbsSurface":
-                    cmds.reverseSurface(str(x))
+                    apiundo.run(cmds.reverseSurface, str(x))
                     x["opposite"] = False
                 elif x.node_type == "mesh":
-                    cmds.polyNormal(str(x), normalMode=0, constructionHistory=False)
+                    apiundo.run(cmds.polyNormal, str(x), normalMode=0, constructionHistory=False)
                     x["opposite"] = False
 
         for locked_attrs in transform_locked_attrs:
@@ -104,12 +105,12 @@ class ControlComponent(Component):
                 transform_node = self.input_shape.transform_node
 
             if transform_node is not None:
-                transform_node = cmds.duplicate(str(transform_node), renameChildren=True)[0]
+                transform_node = apiundo.run(cmds.duplicate, str(transform_node), renameChildren=True)[0]
                 transform_shapes = cmds.listRelatives(transform_node, shapes=True)
                 transform_children = [x for x in cmds.listRelatives(transform_node) if x not in transform_shapes]
 
                 if len(transform_children) > 0:
-                    cmds.delete(transform_children)
+                    apiundo.run(cmds.delete, transform_children)
                 
                 # resetting everything for input shape
                 transform_list = [nw.Node(transform_node)]
@@ -118,7 +119,7 @@ class ControlComponent(Component):
                 transform_locked_attrs = utils.get_transform_locked_attrs(str(curr_transform))
                 
                 # 0ing out the control
-                cmds.parent(str(curr_transform), w=True)
+                apiundo.run(cmds.parent, str(curr_transform), w=True)
                 curr_transform["tx"] = 0.0
                 curr_transform["ty"] = 0.0
                 curr_transform["tz"] = 0.0
@@ -148,7 +149,7 @@ class ControlComponent(Component):
 
             self.freeze_shape_transform(transform)
 
-            cmds.delete(transform, constructionHistory=True)
+            apiundo.run(cmds.delete, transform, constructionHistory=True)
             shape_list.extend(cmds.listRelatives(transform, shapes=True))
 
         
@@ -157,7 +158,7 @@ class ControlComponent(Component):
 
 
         for index, shape in enumerate(shape_list):
-            cmds.parent(shape, str(transform_node), relative=True, shape=True)
+            apiundo.run(cmds.parent, shape, str(transform_node), relative=True, shape=True)
 
             shape_key = "shape{}".format(index+1)
             shape_node = nw.Node(shape)
@@ -173,7 +174,7 @@ class ControlComponent(Component):
         
 
         if transform_list != []:
-            cmds.delete(transform_list)
+            apiundo.run(cmds.delete, transform_list)
 
         # offset with install values
         io_node = self.io_node
@@ -227,12 +228,13 @@ class ControlComponent(Component):
                         
         return filtered_attrs
 
-    def create_component(self, namespace=":", instance_name=None, input_shape=None, **attr_kwargs):
+    def create_component(self, namespace=":", instance_name=None, input_shape=None, undoable=True, **attr_kwargs):
         if "input_shape" in attr_kwargs.keys():
             self.input_shape = attr_kwargs.pop("input_shape")
         self.input_shape = input_shape
-        self.initialize_component(namespace=namespace, instance_name=instance_name, **attr_kwargs)
-        self.build_component(input_shape=self.input_shape)
+        with self._undo_context(undoable):
+            self.initialize_component(namespace=namespace, instance_name=instance_name, **attr_kwargs)
+            self.build_component(input_shape=self.input_shape)
 
     def initialize_component(self, namespace=":", instance_name=None, **attr_kwargs):
         if "input_shape" in attr_kwargs.keys():
@@ -266,9 +268,9 @@ class ControlComponent(Component):
                     for axis in ["X", "Y", "Z"]:
                         axis = "{}{}".format(attr, axis)
                         if axis not in publish_attr_list:
-                            cmds.setAttr(str(transform_node[axis]), lock=True, keyable=False)
+                            apiundo.run(cmds.setAttr, str(transform_node[axis]), lock=True, keyable=False)
             if "visibility" not in publish_attr_list:
-                cmds.setAttr(str(transform_node["visibility"]), lock=True, keyable=False)
+                apiundo.run(cmds.setAttr, str(transform_node["visibility"]), lock=True, keyable=False)
             
 
         return node_data_dict
@@ -366,9 +368,9 @@ class AxisControl(ControlComponent):
         super(AxisControl, self).__init__(container_node, parent_container_node)
     
     def _add_shapes(self):
-        x_axis = cmds.curve(degree=1, point=[[0.0, 0.0, 0.0], [1.0, 0.0, 0.0]])
-        y_axis = cmds.curve(degree=1, point=[[0.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
-        z_axis = cmds.curve(degree=1, point=[[0.0, 0.0, 0.0], [0.0, 0.0, 1.0]])
+        x_axis = apiundo.run(cmds.curve, degree=1, point=[[0.0, 0.0, 0.0], [1.0, 0.0, 0.0]])
+        y_axis = apiundo.run(cmds.curve, degree=1, point=[[0.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+        z_axis = apiundo.run(cmds.curve, degree=1, point=[[0.0, 0.0, 0.0], [0.0, 0.0, 1.0]])
 
         color_component = ColorManager.get_instance(self)
 
@@ -387,7 +389,7 @@ class BoxControl(ControlComponent):
         x = 1.0
         y = 1.0
         z = 1.0
-        box = cmds.curve(degree=1, point=[
+        box = apiundo.run(cmds.curve, degree=1, point=[
             [x, y, z],
             [-x, y, z], [-x, -y, z],  [-x, y, z],
             [-x, y, -z], [-x, -y, -z], [-x, y, -z],
@@ -403,7 +405,7 @@ class CircleControl(ControlComponent):
     has_shape_color_attr = True
 
     def _add_shapes(self):
-        circle = cmds.circle(normal=self._get_axis_vec())[0]
+        circle = apiundo.run(cmds.circle, normal=self._get_axis_vec())[0]
 
         return [circle]
 
@@ -414,7 +416,7 @@ class DiamondControl(ControlComponent):
         return super().initialize_component(namespace, instance_name, **attr_kwargs)
 
     def _add_shapes(self):
-        diamond = cmds.sphere(axis=self._get_axis_vec(), sections=4, spans=2, degree=1)[0]
+        diamond = apiundo.run(cmds.sphere, axis=self._get_axis_vec(), sections=4, spans=2, degree=1)[0]
         return [diamond]
 
 class DiamondWireControl(ControlComponent):
@@ -424,7 +426,7 @@ class DiamondWireControl(ControlComponent):
         return super().initialize_component(namespace, instance_name, **attr_kwargs)
 
     def _add_shapes(self):
-        diamond = cmds.curve(degree=1, point=[
+        diamond = apiundo.run(cmds.curve, degree=1, point=[
             [0, 1, 0], [1, 0, 0], [0, -1, 0],
             [0, 0, 1], [0, 1, 0],
             [-1, 0, 0], [0, -1, 0],
@@ -439,7 +441,7 @@ class GearControl(ControlComponent):
     publish_attr_default=[]
 
     def _add_shapes(self):
-        outer_shape = cmds.curve(degree=3, point=[
+        outer_shape = apiundo.run(cmds.curve, degree=3, point=[
             [0.303359, 0, 0.940211], [0.662567, 0, 0.732822], [0.707107, 0, 0.720888], [0.751647, 0, 0.732822],
             [0.925336, 0, 0.833101], [0.973133, 0, 0.839394], [1.011381, 0, 0.810046], [1.20721, 0, 0.470859],
             [1.213503, 0, 0.423061], [1.184155, 0, 0.384813], [1.010466, 0, 0.284534], [0.97786, 0, 0.251929], 
@@ -460,7 +462,7 @@ class GearControl(ControlComponent):
             [0.24037, 0, 1.262455], [0.258819, 0, 1.217915], [0.258819, 0, 1.017356], [0.270754, 0, 0.972816], 
             [0.303359, 0, 0.940211],
         ])
-        inner_shape = cmds.curve(degree=3, point=[ 
+        inner_shape = apiundo.run(cmds.curve, degree=3, point=[ 
             [0.0942458, 0, 0.586178], [0.154925, 0, 0.578189], [0.21147, 0, 0.554768], [0.374708, 0, 0.460522], 
             [0.423264, 0, 0.423264], [0.460522, 0, 0.374708], [0.554768, 0, 0.21147], [0.578189, 0, 0.154925], 
             [0.586178, 0, 0.0942458], [0.586178, 0, -0.0942458], [0.578189, 0, -0.154925], [0.554768, 0, -0.21147], 
@@ -480,9 +482,9 @@ class GimbalControl(ControlComponent):
         super(GimbalControl, self).__init__(container_node, parent_container_node)
 
     def _add_shapes(self):
-        circle1 = cmds.circle(normal=[1.0, 0.0, 0.0])[0]
-        circle2 = cmds.circle(normal=[0.0, 1.0, 0.0])[0]
-        circle3 = cmds.circle(normal=[0.0, 0.0, 1.0])[0]
+        circle1 = apiundo.run(cmds.circle, normal=[1.0, 0.0, 0.0])[0]
+        circle2 = apiundo.run(cmds.circle, normal=[0.0, 1.0, 0.0])[0]
+        circle3 = apiundo.run(cmds.circle, normal=[0.0, 0.0, 1.0])[0]
 
         color_component = ColorManager.get_instance(self)
 
@@ -499,7 +501,7 @@ class Pyramid4Control(ControlComponent):
         return super().initialize_component(namespace, instance_name, **attr_kwargs)
 
     def _add_shapes(self):
-        pyramid = cmds.curve(degree=1, point=[
+        pyramid = apiundo.run(cmds.curve, degree=1, point=[
             [1, 0, 1], [1, 0, -1], [0, 1.4, 0], [1, 0, 1],
             [-1, 0, 1], [0, 1.4, 0], [-1, 0, -1], [-1, 0, 1], 
             [-1, 0, -1], [1, 0, -1]
@@ -522,5 +524,5 @@ class SphereControl(ControlComponent):
         return super().initialize_component(namespace, instance_name, **attr_kwargs)
 
     def _add_shapes(self):
-        sphere = cmds.sphere(axis=self._get_axis_vec())[0]
+        sphere = apiundo.run(cmds.sphere, axis=self._get_axis_vec())[0]
         return [sphere]
\ No newline at end of file
@@ -5,6 +5,7 @@ import components.matrix_component as matrix_components
 import components.components as components
 import system.data as data
 import utils.node_wrapper as nw
+import utils.apiundo as apiundo
 import utils.utils as utils
 import utils.enum as utils_enum
 import maya.cmds as cmds
@@ -79,7 +80,7 @@ class FKComponent(MotionComponent):
                 if input_shape.node_type == "container":
                     container = input_shape
                 
-                control = utils.string_to_class(container["componentClass"].value)
+                control = Component.get_class(container["componentClass"].value)
                 input_shape = control(container).transform_node
 
             control_inst = self.promote_to_control(attr=curr_local_attr, parent=parent, control=control, input_shape=input_shape, **kwarg_data)
@@ -334,7 +335,7 @@ class IKComponent(MotionComponent):
                 ])
 
             expression_str = "".join(expression_str)
-            expression = nw.Node(cmds.expression(string=expression_str, name="ik_expression"))
+            expression = nw.Node(apiundo.run(cmds.expression, string=expression_str, name="ik_expression"))
             node_data_dict.add_node_data(data.NodeData(node=expression))
 
         else:
@@ -1,5 +1,6 @@
 from system.base_components import Component
 import utils.node_wrapper as nw
+import utils.apiundo as apiundo
 import system.data as data
 import utils.utils as utils
 import utils.enum as utils_enum
@@ -49,7 +50,7 @@ class SetupComponent(Component):
                 hier_list.append(hier_index)
 
         # creating visual help curve
-        guide_curve = nw.Node(cmds.curve(name="guide", degree=1, point=[[0.0, x, 0.0] for x in range(len(hier_list))]))
+        guide_curve = nw.Node(apiundo.run(cmds.curve, name="guide", degree=1, point=[[0.0, x, 0.0] for x in range(len(hier_list))]))
         guide_curve_shape = nw.Node(cmds.listRelatives(str(guide_curve), shapes=True)[0])
         guide_curve_shape["overrideEnabled"] = True
         guide_curve_shape["overrideDisplayType"] = 2
@@ -59,11 +60,11 @@ class SetupComponent(Component):
         guide_curve["worldMatrix"][0] >> guild_curve_world_point["inMatrix"]
 
         # attach curve
-        attach_curve = nw.Node(cmds.curve(name="guide", degree=1, point=[[0.0, x, 0.0] for x in range(2)]))
+        attach_curve = nw.Node(apiundo.run(cmds.curve, name="guide", degree=1, point=[[0.0, x, 0.0] for x in range(2)]))
         attach_curve_shape = nw.Node(cmds.listRelatives(str(attach_curve), shapes=True)[0])
         attach_curve_shape["overrideEnabled"] = True
         attach_curve_shape["overrideDisplayType"] = 2
-        cmds.parent(str(attach_curve_shape), str(guide_curve), relative=True, shape=True)
+        apiundo.run(cmds.parent, str(attach_curve_shape), str(guide_curve), relative=True, shape=True)
         attach_curve.delete_node()
 
         # attach curve connections and nodes
@@ -153,9 +154,9 @@ class SetupComponent(Component):
             node_data_dict.add_node_data(node_data=data.NodeData(node=matrix_point))
             node_data_dict.add_node_data(node_data=data.NodeData(pick_matrix))
 
-        expr_node = nw.Node(cmds.expression(string="\n".join(expr_str), name="guidExpr"))
+        expr_node = nw.Node(apiundo.run(cmds.expression, string="\n".join(expr_str), name="guidExpr"))
 
-        cmds.parent(str(guide_curve), str(self.transform_node), relative=True)
+        apiundo.run(cmds.parent, str(guide_curve), str(self.transform_node), relative=True)
 
         node_data_dict.add_node_data(node_data=data.NodeData(node=guide_curve))
         node_data_dict.add_node_data(node_data=data.NodeData(node=guide_curve_shape))
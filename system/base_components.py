@@ -1,17 +1,78 @@
 import maya.cmds as cmds
+from maya.api import OpenMaya as om2
 
 import utils.node_wrapper as nw
 import utils.enum as utils_enum
 import utils.utils as utils
+import utils.apiundo as apiundo
 import system.data as data
 
 import re
 
+# matches hier kwarg keys ie. "hier0"
+_hier_key_pattern = re.compile(r"{}\d+".format(data.HierDataAttrNames.hier.value))
+
+# io node hash -> (om2.MObjectHandle, {(component class, mirror): namespace})
+_instance_namespace_cache = {}
+_instance_namespace_attr_names = ["componentInstName", data.HierDataAttrNames.hier_side.value]
+
+# remove callbacks from a previous import of the module
+if "_instance_namespace_callback_ids" in globals():
+    om2.MMessage.removeCallbacks(list(_instance_namespace_callback_ids.values()))
+if "_io_node_removed_callback_id" in globals():
+    om2.MMessage.removeCallback(_io_node_removed_callback_id)
+_instance_namespace_callback_ids = {}
+
+def _release_instance_namespaces(io_node_hash):
+    """drops the cached instance namespaces of an io node and stops 
+    watching its attributes
+
+    Args:
+        io_node_hash (int): hash of the io node
+    """
+    _instance_namespace_cache.pop(io_node_hash, None)
+    callback_id = _instance_namespace_callback_ids.pop(io_node_hash, None)
+    if callback_id is not None:
+        om2.MMessage.removeCallback(callback_id)
+
+def _on_io_attr_changed(message, plug, other_plug, io_node_hash):
+    """clears the cached instance namespaces of an io node when one of
+    the attributes they're made from changes
+
+    Args:
+        message (int): om2.MNodeMessage.AttributeMessage
+        plug (om2.MPlug):
+        other_plug (om2.MPlug):
+        io_node_hash (int): hash of the io node
+    """
+    if om2.MFnAttribute(plug.attribute()).name in _instance_namespace_attr_names:
+        _release_instance_namespaces(io_node_hash)
+
+def _on_io_node_removed(mobject, client_data):
+    """clears the cached instance namespaces of a deleted io node
+
+    Args:
+        mobject (om2.MObject): node being removed
+        client_data ():
+    """
+    io_node_hash = om2.MObjectHandle(mobject).hashCode()
+    if io_node_hash in _instance_namespace_callback_ids or io_node_hash in _instance_namespace_cache:
+        _release_instance_namespaces(io_node_hash)
+
+_io_node_removed_callback_id = om2.MDGMessage.addNodeRemovedCallback(_on_io_node_removed, "network")
+
+def _watch_instance_namespace_attrs(io_node):
+    callback_id = _instance_namespace_callback_ids.pop(hash(io_node), None)
+    if callback_id is not None:
+        om2.MMessage.removeCallback(callback_id)
+    _instance_namespace_callback_ids[hash(io_node)] = om2.MNodeMessage.addAttributeChangedCallback(
+        io_node.mobject, _on_io_attr_changed, hash(io_node))
+
 def get_component(container_node):
     if container_node is None:
         return None
     if container_node.has_attr("componentClass"):
-        component_class = utils.string_to_class(container_node["componentClass"].value)
+        component_class = Component.get_class(container_node["componentClass"].value)
         return component_class(container_node)
 
 
@@ -23,26 +84,45 @@ class Component:
     has_side_attr = False
     side_attr_default = utils_enum.CharacterSide.none
 
+    # class name (module.Class) -> component class
+    _registry = {}
+
+    # (has instance name, has mirror dest) -> data.NodeBuildDataDict
+    _node_data_templates = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        Component._registry[utils.class_type_to_str(cls)] = cls
+        cls._node_data_templates = {}
+
+    @classmethod
+    def get_class(cls, class_name:str):
+        """gets a component class from its class name (the componentClass 
+        attribute). classes not registered yet are imported and cached
+
+        Args:
+            class_name (str): ie. components.control_components.SphereControl
+
+        Returns:
+            type:
+        """
+        component_class = Component._registry.get(class_name)
+        if component_class is None:
+            component_class = utils.string_to_class(class_name)
+            if component_class is not None:
+                Component._registry[class_name] = component_class
+        return component_class
+
     
     @property
     def instance_namespace(self):
-        namespace = utils.camel_to_snake(self.class_short_name)
-        if self.io_node is None or not self.io_node.has_attr("componentInstName"):
-            return namespace
-        instance_name = self.io_node["componentInstName"].value
-        if instance_name is not None and instance_name.find(".") != -1:
-            instance_name = instance_name.rsplit(".", 1)[-1]
-        if self.io_node.has_attr(data.HierDataAttrNames.hier_side.value):
-            index =self.io_node[data.HierDataAttrNames.hier_side.value].value
-            if index > 0:
-                side = utils_enum.CharacterSide.get(index).value
-                instance_name = "{}_{}".format(side, instance_name)
-        if instance_name is not None and instance_name != "":
-            return "{}__{}".format(instance_name, namespace)
-        return namespace
+        return self._get_cached_instance_namespace(mirror=False)
 
     @property
     def mirror_instance_namespace(self):
+        return self._get_cached_instance_namespace(mirror=True)
+
+    def _get_instance_namespace(self, mirror=False):
         namespace = utils.camel_to_snake(self.class_short_name)
         if self.io_node is None or not self.io_node.has_attr("componentInstName"):
             return namespace
@@ -52,26 +132,60 @@ class Component:
         if self.io_node.has_attr(data.HierDataAttrNames.hier_side.value):
             index =self.io_node[data.HierDataAttrNames.hier_side.value].value
             if index > 0:
-                side = utils_enum.CharacterSide.opposite(utils_enum.CharacterSide.get(index)).value
-                instance_name = "{}_{}".format(side, instance_name)
+                side = utils_enum.CharacterSide.get(index)
+                if mirror:
+                    side = utils_enum.CharacterSide.opposite(side)
+                instance_name = "{}_{}".format(side.value, instance_name)
         if instance_name is not None and instance_name != "":
             return "{}__{}".format(instance_name, namespace)
         return namespace
 
+    def _get_cached_instance_namespace(self, mirror=False):
+        """instance namespace cached per io node. cleared when the io 
+        node's componentInstName or hierSide changes. not cached while
+        either is driven by a connection
+
+        Args:
+            mirror (bool, optional): Defaults to False.
+
+        Returns:
+            str:
+        """
+        io_node = self.io_node
+        if io_node is None:
+            return self._get_instance_namespace(mirror)
+
+        key = (type(self), mirror)
+        cached = _instance_namespace_cache.get(hash(io_node))
+        if cached is not None and cached[0].isValid() and cached[0].object() == io_node.mobject:
+            if key in cached[1]:
+                return cached[1][key]
+        else:
+            cached = None
+
+        namespace = self._get_instance_namespace(mirror)
+        for attr_name in _instance_namespace_attr_names:
+            if io_node.has_attr(attr_name) and io_node[attr_name].plug.isDestination:
+                return namespace
+
+        if cached is None:
+            cached = (om2.MObjectHandle(io_node.mobject), {})
+            _instance_namespace_cache[hash(io_node)] = cached
+            _watch_instance_namespace_attrs(io_node)
+        cached[1][key] = namespace
+        return namespace
+
     @property
     def transform_node(self):
-        if self.container_node is not None and self.container_node.has_attr("rootTransformNode"):
-            return utils.get_first_connected_node(self.container_node["rootTransformNode"], as_source=True)
+        return self._get_cached_node("transform_node", self._get_transform_node)
         
     @property
     def subcomponent_grp_node(self):
-        if self.container_node is not None and self.container_node.has_attr("subComponentGrp"):
-            return utils.get_first_connected_node(self.container_node["subComponentGrp"], as_source=True)
+        return self._get_cached_node("subcomponent_grp_node", self._get_subcomponent_grp_node)
 
     @property
     def io_node(self):
-        if self.container_node is not None:
-            return utils.get_first_connected_node(self.container_node[self._io_name.connect_attr_name], as_source=True)
+        return self._get_cached_node("io_node", self._get_io_node)
     
     @property
     def class_name(self):
@@ -83,6 +197,25 @@ class Component:
     
     @property
     def mirror_dest_container(self):
+        return self._get_cached_node("mirror_dest_container", self._get_mirror_dest_container)
+
+    @property
+    def mirror_source_container(self):
+        return self._get_cached_node("mirror_source_container", self._get_mirror_source_container)
+
+    def _get_transform_node(self):
+        if self.container_node is not None and self.container_node.has_attr("rootTransformNode"):
+            return utils.get_first_connected_node(self.container_node["rootTransformNode"], as_source=True)
+
+    def _get_subcomponent_grp_node(self):
+        if self.container_node is not None and self.container_node.has_attr("subComponentGrp"):
+            return utils.get_first_connected_node(self.container_node["subComponentGrp"], as_source=True)
+
+    def _get_io_node(self):
+        if self.container_node is not None:
+            return utils.get_first_connected_node(self.container_node[self._io_name.connect_attr_name], as_source=True)
+
+    def _get_mirror_dest_container(self):
         if self.container_node.has_attr("mirrorSource"):
             mirror_source_node = utils.get_first_connected_node(self.container_node["mirrorSource"], as_source=True, as_dest=False)
             if mirror_source_node.has_attr("mirrorDest"):
@@ -90,8 +223,7 @@ class Component:
             else:
                 return utils.get_first_connected_node(mirror_source_node["mirrorComponent"], as_source=True, as_dest=False)
             
-    @property
-    def mirror_source_container(self):
+    def _get_mirror_source_container(self):
         if self.container_node.has_attr("mirrorDest"):
             mirror_dest_node = utils.get_first_connected_node(self.container_node["mirrorDest"], as_source=False, as_dest=True)
             if mirror_dest_node.has_attr("mirrorSource"):
@@ -114,13 +246,44 @@ class Component:
         self.parent_container_node = parent_container_node
 
         self._io_name = data.IOName
+        self._node_cache = {}
+        self._node_cache_container = None
+
+    def _get_cached_node(self, key, get_node):
+        """returns the node cached under key, getting it with get_node
+        if it isn't cached or was deleted. None isn't cached
+
+        Args:
+            key (str):
+            get_node (function):
+
+        Returns:
+            Union[nw.Node, None]:
+        """
+        if self._node_cache_container is not self.container_node:
+            self.clear_node_cache()
+            self._node_cache_container = self.container_node
+
+        node = self._node_cache.get(key)
+        if node is not None and node.is_valid():
+            return node
+        node = get_node()
+        if node is not None:
+            self._node_cache[key] = node
+        return node
+
+    def clear_node_cache(self):
+        """clears the cached io, transform, subcomponent group and mirror
+        nodes. called on build and rename
+        """
+        self._node_cache = {}
 
     def insert_component(self, component, transform_parent=None, transform_relative=True, build=True, **component_kwargs):
         if self.container_node is None:
             cmds.warning("unable to insert component {}".format(Component.__name__))
 
         current_namespace = utils.Namespace.get_namespace(str(self.container_node))
-        cmds.namespace(setNamespace=":")
+        apiundo.run(cmds.namespace, setNamespace=":")
 
         if component_kwargs == {}:
             insert_component_inst = component(parent_container_node=self.container_node)
@@ -134,10 +297,10 @@ class Component:
         #parent the transform
         transform_node = insert_component_inst.transform_node
         if transform_parent is not None:
-            cmds.parent(str(transform_node), str(transform_parent), relative=transform_relative)
+            apiundo.run(cmds.parent, str(transform_node), str(transform_parent), relative=transform_relative)
         elif transform_node is not None:
             if transform_parent is not None:
-                cmds.parent(str(transform_node), str(transform_parent), relative=transform_relative)
+                apiundo.run(cmds.parent, str(transform_node), str(transform_parent), relative=transform_relative)
             
             # get container with transform
             curr_container = self.container_node
@@ -151,7 +314,7 @@ class Component:
                     transform_parent = curr_component.subcomponent_grp_node
                     if transform_parent is None:
                         transform_parent = nw.Node.create_node("transform", name="sub_component_grp")
-                        cmds.parent(str(transform_parent), str(curr_component.transform_node))
+                        apiundo.run(cmds.parent, str(transform_parent), str(curr_component.transform_node))
                         curr_container.add_nodes(transform_parent)
                         utils.map_node_to_container("subComponentGrp", transform_parent)
                     break
@@ -163,7 +326,7 @@ class Component:
             # get container here and sent it to parent
             if transform_parent is not None:
 
-                cmds.parent(str(transform_node), str(transform_parent))
+                apiundo.run(cmds.parent, str(transform_node), str(transform_parent))
 
         self.container_node.add_nodes(insert_component_inst.container_node)
 
@@ -198,12 +361,15 @@ class Component:
         # stripping colons from namespace
         new_namespace = utils.Namespace.strip_outer_colons(new_namespace)
 
+        rename_plan = nw.RenamePlan()
         for node in nodes:
-            if utils.Namespace.get_namespace(str(node)) != new_namespace and node.node_type != "container":
-                
-                new_node_name = node.name.rsplit(":")[-1]
-                new_node_name = "{}:{}".format(new_namespace, new_node_name)
-                node.rename(new_node_name)
+            if node.node_type == "container":
+                continue
+            node_namespace, _, node_name = node.get_dep_node().name().rpartition(":")
+            if node_namespace != new_namespace:
+                rename_plan.add(node, "{}:{}".format(new_namespace, node_name))
+        rename_plan.execute()
+        self.clear_node_cache()
         
     def _init_node_data(self, instance_name=None, **attr_kwargs):
         node_data_dict = data.NodeBuildDataDict()
@@ -242,6 +408,34 @@ class Component:
 
         return node_data_dict
 
+    def gen_node_data(self, instance_name=None, **attr_kwargs):
+        """clones the class's node data template, compiling it with 
+        _init_node_data the first time it's needed. the templates only 
+        depend on the class, whether there's an instance name and whether 
+        there's a mirror_dest kwarg so they're shared by every instance
+
+        Args:
+            instance_name (str, optional): Defaults to None.
+
+        Returns:
+            data.NodeBuildDataDict:
+        """
+        templates = type(self)._node_data_templates
+        template_key = (instance_name is not None, "mirror_dest" in attr_kwargs.keys())
+        if template_key not in templates.keys():
+            template = self._init_node_data(
+                instance_name="" if template_key[0] else None, 
+                **({"mirror_dest": None} if template_key[1] else {})
+            )
+            for node_key in template:
+                template[node_key].get_add_attr_list()
+            templates[template_key] = template
+
+        node_data_dict = templates[template_key].clone()
+        if instance_name is not None and instance_name != "":
+            node_data_dict[self._io_name.node_name].attr_values["componentInstName"].value = instance_name
+        return node_data_dict
+
     def _add_component_inst_name_data(self, node_data_dict, instance_name):
         node_data_dict[self._io_name.node_name].add_attr_data(data.AttrData("componentInstName", publish_name=True, type="string", parent="install"))
 
@@ -395,7 +589,7 @@ class Component:
                 if freeze_control:
                     control_component.io_node["offsetMatrix"] = matrix_attr.value
                 else:
-                    cmds.xform(str(control_transform_node), ws=True, matrix=matrix_attr.value)
+                    apiundo.run(cmds.xform, str(control_transform_node), ws=True, matrix=matrix_attr.value)
                     
         control_io_node = control_component.io_node
         control_io_node["worldMatrix"] >> matrix_attr
@@ -410,7 +604,7 @@ class Component:
         if self.container_node is None:
             
             # Node data
-            node_data_dict = self._init_node_data(instance_name=instance_name, **attr_kwargs)
+            node_data_dict = self.gen_node_data(instance_name=instance_name, **attr_kwargs)
 
             if namespace == ":":
                 namespace = utils.Namespace.combine_namespace([self.instance_namespace])
@@ -452,50 +646,12 @@ class Component:
                 continue
 
             # getting attribute name
-            attr_name = key
-            if not self.container_node.has_attr(utils.snake_to_camel(attr_name)):
-                attr_name=utils.snake_to_camel(attr_name.replace("__", "."))
-                
-                attr_split_parts = []
-
-                beg=0
-                end=-1
-                for index in range(1, len(attr_name)):
-                    # see if end needs to be set
-                    if index + 1 == len(attr_name):
-                        end = index
-                    elif not attr_name[index].isdigit() and attr_name[index+1].isdigit():
-                        end = index
-                    elif attr_name[index].isdigit() and not attr_name[index+1].isdigit():
-                        end = index
-
-
-                    # of end is > begining
-                    if end >= beg:
-                        if attr_name[beg].isdigit():
-                            attr_split_parts.append("[" + attr_name[beg: end + 1] + "].")
-                        else:
-                            attr_split_parts.append(attr_name[beg: end + 1])
-                        beg = end + 1
-                        end = -1
-
-                        #lowercase after every
-                        if beg + 1 < len(attr_name):
-                            if attr_name[beg].isupper():
-                                attr_split_parts.append(attr_name[beg:beg+1].lower())
-                                beg += 1
-                
-                attr_name = "".join(attr_split_parts)
-                attr_name = attr_name.replace("]..[", "][")
-                if attr_name[-1] == ".":
-                    attr_name=attr_name[:-1]
-            else:
-                attr_name = utils.snake_to_camel(attr_name)
+            attr_name = utils.snake_to_camel(key)
+            if not self.container_node.has_attr(attr_name):
+                attr_name = utils.kwarg_key_to_attr_path(key)
 
             # hier data key
-            pattern = r"{}\d+".format(data.HierDataAttrNames.hier.value)
-
-            if re.fullmatch(pattern, utils.snake_to_camel(key)):
+            if _hier_key_pattern.fullmatch(utils.snake_to_camel(key)):
 
                 key_index = utils.get_trailing_numbers(key)
                 hier_names = data.HierDataAttrNames
@@ -534,20 +690,31 @@ class Component:
                 continue
             attr = self.container_node[attr_data.attr_name]
             # connecting or setting
-            locked = attr.is_locked()
-            attr.set_locked(False)
-            if isinstance(attr_data.attr_value, nw.Attr):
-                if attr_data.as_dest:
-                    attr_data.attr_value >> self.container_node[attr_data.attr_name]
+            with nw.LockManager(attr):
+                if isinstance(attr_data.attr_value, nw.Attr):
+                    if attr_data.as_dest:
+                        attr_data.attr_value >> attr
+                    else:
+                        attr >> attr_data.attr_value
                 else:
-                    self.container_node[attr_data.attr_name] >> attr_data.attr_value
-            else:
-                self.container_node[attr_data.attr_name] = attr_data.attr_value
-            attr.set_locked(locked)
-
-    def create_component(self, namespace=":", instance_name=None, **attr_kwargs): 
-        self.initialize_component(namespace=namespace, instance_name=instance_name, **attr_kwargs)
-        self.build_component()
+                    attr.set(attr_data.attr_value)
+
+    @staticmethod
+    def _undo_context(undoable):
+        """undo scope for creating a component. one undo step for the 
+        whole component, or no undo capture at all
+
+        Args:
+            undoable (bool):
+        """
+        if undoable:
+            return apiundo.journal()
+        return apiundo.disabled()
+
+    def create_component(self, namespace=":", instance_name=None, undoable=True, **attr_kwargs): 
+        with self._undo_context(undoable):
+            self.initialize_component(namespace=namespace, instance_name=instance_name, **attr_kwargs)
+            self.build_component()
     
 
     def parent(self, attr):
@@ -753,20 +920,24 @@ class Component:
     def build_component(self):
         if not self.try_delete_build_nodes():
             return
-        io_node = self.io_node
-        io_node["built"].set_locked(False)
-        io_node["built"] = True
-        io_node["built"].set_locked(True)
+        self.clear_node_cache()
+        # connections and sets of the build (and inserted sub components)
+        # share one modifier and one undo record
+        with nw.transaction():
+            io_node = self.io_node
+            io_node["built"].set_locked(False)
+            io_node["built"] = True
+            io_node["built"].set_locked(True)
 
-        node_data_dict = self._pre_build_component()
-        namespace = utils.Namespace.get_namespace(str(self.container_node))
-        node_data_dict.handle_node_data(namespace)
+            node_data_dict = self._pre_build_component()
+            namespace = utils.Namespace.get_namespace(str(self.container_node))
+            node_data_dict.handle_node_data(namespace)
 
-        node_data_dict.publish_attrs(self.container_node)
-        container_add_nodes = [node_data_dict[node_key].node for node_key in node_data_dict if node_data_dict[node_key].node is not self.container_node]
-        container_add_nodes = [node for node in container_add_nodes if node.get_container() is None]
-        self.container_node.add_nodes(*container_add_nodes, include_hierarchy_below=True)
-        self.rename_nodes()
+            node_data_dict.publish_attrs(self.container_node)
+            container_add_nodes = [node_data_dict[node_key].node for node_key in node_data_dict if node_data_dict[node_key].node is not self.container_node]
+            container_add_nodes = [node for node in container_add_nodes if node.get_container() is None]
+            self.container_node.add_nodes(*container_add_nodes, include_hierarchy_below=True)
+            self.rename_nodes()
 
     def _pre_build_component(self):
         node_data_dict = data.NodeBuildDataDict()
@@ -777,27 +948,39 @@ class Component:
 
         return node_data_dict
     
+    def get_build_nodes(self):
+        """gets the container's member nodes made by the build. members 
+        connected from the container's dynamic attributes are preserved
+
+        Returns:
+            list(nw.Node):
+        """
+        container_node = self.container_node
+        member_handles = nw.get_container_index().get_members(container_node.mobject)
+        member_hashes = {x.hashCode() for x in member_handles}
+
+        preserved_hashes = set()
+        for attr in container_node.get_dynamic_attribute_list():
+            for dest_plug in attr.plug.connectedTo(False, True):
+                node_hash = om2.MObjectHandle(dest_plug.node()).hashCode()
+                if node_hash in member_hashes:
+                    preserved_hashes.add(node_hash)
+
+        return [nw.Node(x.object()) for x in member_handles if x.hashCode() not in preserved_hashes]
+
     def try_delete_build_nodes(self):
         container_node = self.container_node
         namespace_list = [utils.Namespace.get_namespace(str(x)) for x in container_node.get_child_containers(all=True)]
-        attr_list = container_node.get_dynamic_attribute_list()
-        non_delete_nodes = []
-        for attr in attr_list:
-            connections = attr.get_as_source_connection_list()
-            for connection in connections:
-                if connection.node in container_node.get_nodes():
-                    non_delete_nodes.append(connection.node)
-
-        non_delete_nodes = list(set(non_delete_nodes))
-        delete_nodes = [x for x in container_node.get_nodes() if x not in non_delete_nodes]
+        delete_nodes = self.get_build_nodes()
         if delete_nodes == []:
             return True
         if not type(self).is_rebuildable:
             cmds.warning("component {} is not rebuildable".format(str(self.container_node)))
             return False
 
-        for node in delete_nodes:
-            node.delete_node()
+        delete_plan = nw.DeletePlan()
+        delete_plan.add_nodes(*delete_nodes)
+        delete_plan.execute()
 
         for namespace in namespace_list[::-1]:
             utils.Namespace.delete(namespace)
@@ -0,0 +1,196 @@
+import components.character_component as character_components
+
+import utils.enum as utils_enum
+import utils.node_wrapper as nw
+import utils.utils as utils
+import utils.apiundo as apiundo
+import system.base_components as base_components
+
+import importlib
+
+importlib.reload(utils)
+importlib.reload(utils_enum)
+importlib.reload(apiundo)
+importlib.reload(nw)
+importlib.reload(base_components)
+importlib.reload(character_components)
+
+import maya.cmds as cmds
+import time
+
+
+def _time_it(function, repeat=1):
+    """runs function repeat times and returns the fastest run in seconds
+
+    Args:
+        function (function):
+        repeat (int, optional): Defaults to 1.
+
+    Returns:
+        float:
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def _build_biped(undoable=True):
+    cmds.file(new=True, force=True)
+    char_inst = character_components.BipedCharacter()
+    char_inst.create_component(
+        instance_name="Tanner",
+        undoable=undoable,
+        primary_side = utils_enum.CharacterSide.left,
+        non_mirror_side = utils_enum.CharacterSide.mid,
+        non_mirror_color = utils_enum.Colors.yellow,
+        setup_color = utils_enum.Colors.yellow,
+        primary_side_color = utils_enum.Colors.blue,
+        mirror_side_color = utils_enum.Colors.red,
+        secondary_side_color = utils_enum.Colors.light_blue,
+        mirror_secondary_side_color = utils_enum.Colors.light_pink
+    )
+
+def _count_build_work(undoable=True):
+    """builds a BipedCharacter counting the undo records committed and
+    the Attr values read
+
+    Args:
+        undoable (bool, optional): Defaults to True.
+
+    Returns:
+        tuple(int, int): commits, value reads
+    """
+    counts = {"commits": 0, "reads": 0}
+    commit = apiundo.commit
+    value_property = nw.Attr.__dict__["value"]
+    def counted_commit(*args, **kwargs):
+        # commits made with undo disabled are dropped
+        if apiundo.is_enabled():
+            counts["commits"] += 1
+        return commit(*args, **kwargs)
+    def counted_value(attr):
+        counts["reads"] += 1
+        return value_property.fget(attr)
+
+    apiundo.commit = counted_commit
+    nw.Attr.value = property(counted_value)
+    try:
+        _build_biped(undoable)
+    finally:
+        apiundo.commit = commit
+        nw.Attr.value = value_property
+    return counts["commits"], counts["reads"]
+
+def benchmark_biped_build(repeat=3, min_speedup=1.2):
+    """times a BipedCharacter build with and without undo capture and 
+    counts the undo records and value reads the no undo build skips
+
+    Args:
+        repeat (int, optional): Defaults to 3.
+        min_speedup (float, optional): the no undo build has to be at 
+        least this many times faster. Defaults to 1.2.
+
+    Raises:
+        AssertionError: if the no undo build commits undo records, 
+        doesn't skip value reads or is slower than min_speedup
+
+    Returns:
+        float: speedup
+    """
+    undoable_commits, undoable_reads = _count_build_work(undoable=True)
+    fast_commits, fast_reads = _count_build_work(undoable=False)
+    undoable_time = _time_it(lambda: _build_biped(undoable=True), repeat)
+    fast_time = _time_it(lambda: _build_biped(undoable=False), repeat)
+    speedup = undoable_time / fast_time
+    print("BipedCharacter build")
+    print("    undoable:  {:.3f}s, {} commits, {} value reads".format(undoable_time, undoable_commits, undoable_reads))
+    print("    no undo:   {:.3f}s, {} commits, {} value reads".format(fast_time, fast_commits, fast_reads))
+    print("    skipped:   {} commits, {} value reads".format(undoable_commits - fast_commits, undoable_reads - fast_reads))
+    print("    speedup:   {:.2f}x".format(speedup))
+    assert fast_commits == 0, "no undo build committed {} undo records".format(fast_commits)
+    assert fast_reads < undoable_reads, "no undo build skipped no value reads"
+    assert speedup >= min_speedup, "no undo build speedup {:.2f}x is under {:.2f}x".format(speedup, min_speedup)
+    return speedup
+
+def _build_member_container(node_count, preserved_count=10):
+    """makes a container of node_count network nodes with 
+    preserved_count of them connected from the container's dynamic 
+    attributes
+
+    Args:
+        node_count (int):
+        preserved_count (int, optional): Defaults to 10.
+
+    Returns:
+        nw.Container:
+    """
+    cmds.file(new=True, force=True)
+    container_node = nw.Container.create_node("benchmark")
+    member_list = [cmds.createNode("network") for _ in range(node_count)]
+    cmds.container(str(container_node), edit=True, addNode=member_list)
+    for index in range(preserved_count):
+        attr_name = "preserved{}".format(index)
+        cmds.addAttr(str(container_node), longName=attr_name, attributeType="message")
+        cmds.addAttr(member_list[index], longName="preservedBy", attributeType="message")
+        cmds.connectAttr("{}.{}".format(container_node, attr_name), "{}.preservedBy".format(member_list[index]))
+    return container_node
+
+def benchmark_build_node_scan(node_counts=(1000, 2500, 5000, 10000), repeat=3, max_growth=2.0):
+    """times Component.get_build_nodes (the try_delete_build_nodes
+    precheck) for containers of increasing size. time per node should 
+    stay flat
+
+    Args:
+        node_counts (tuple(int), optional): Defaults to (1000, 2500, 5000, 10000).
+        repeat (int, optional): Defaults to 3.
+        max_growth (float, optional): how many times the time per node 
+        of the largest container can be over the smallest's. 
+        Defaults to 2.0.
+
+    Raises:
+        AssertionError: if the time per node grows past max_growth
+
+    Returns:
+        dict{int, float}: node count to seconds per node
+    """
+    print("Component.get_build_nodes")
+    per_node_times = {}
+    for node_count in node_counts:
+        component = base_components.Component(_build_member_container(node_count))
+        index = nw.get_container_index()
+        def scan():
+            index.set_dirty()
+            component.get_build_nodes()
+        scan_time = _time_it(scan, repeat)
+        per_node_times[node_count] = scan_time / node_count
+        print("    {:>6} nodes: {:.3f}s ({:.2f}us/node)".format(
+            node_count, scan_time, per_node_times[node_count] * 1000000))
+
+    growth = per_node_times[max(node_counts)] / per_node_times[min(node_counts)]
+    print("    growth:    {:.2f}x per node".format(growth))
+    assert growth <= max_growth, "time per node grew {:.2f}x from {} to {} nodes".format(
+        growth, min(node_counts), max(node_counts))
+    return per_node_times
+
+def benchmark_kwarg_key_parse(key_count=200, repeat=100):
+    """times utils.kwarg_key_to_attr_path for hier style kwarg keys 
+    cold (cache cleared every run) and warm"""
+    key_list = ["hier{}__input_world_matrix".format(index) for index in range(key_count)]
+    def parse(clear_cache):
+        if clear_cache:
+            utils.snake_to_camel.cache_clear()
+            utils.kwarg_key_to_attr_path.cache_clear()
+        for key in key_list:
+            utils.kwarg_key_to_attr_path(key)
+    cold_time = _time_it(lambda: parse(True), repeat)
+    warm_time = _time_it(lambda: parse(False), repeat)
+    print("utils.kwarg_key_to_attr_path ({} keys)".format(key_count))
+    print("    cold:      {:.2f}us/key".format(cold_time / key_count * 1000000))
+    print("    warm:      {:.2f}us/key".format(warm_time / key_count * 1000000))
+
+def benchmark():
+    benchmark_biped_build()
+    benchmark_build_node_scan()
+    benchmark_kwarg_key_parse()
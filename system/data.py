@@ -1,6 +1,7 @@
 import system.globals as globals
 import utils.node_wrapper as nw
 import maya.cmds as cmds
+from maya.api import OpenMaya as om2
 import utils.utils as utils
 import utils.enum as utils_enum
 from enum import Enum
@@ -16,6 +17,16 @@ class AttrData:
         self.connection = connection
         self.publish_name = publish_name
 
+    def clone(self):
+        """copy that can be edited without changing this attr data
+
+        Returns:
+            AttrData:
+        """
+        attr_data = AttrData.__new__(AttrData)
+        attr_data.__dict__.update(self.__dict__)
+        attr_data.add_attr_kwargs = dict(self.add_attr_kwargs)
+        return attr_data
 
     def __str__(self):
         return "<AttrValuesData> name:{} | value:{} | lock:{} | keyable: {} | alias: {}| connection:{} | kwargs:{} | publish name: {}".format(
@@ -36,6 +47,7 @@ class NodeData():
         self.node_type = node_type
         self.map_node_attr=map_node_attr
         self.attr_values = {}
+        self._add_attr_list = None
 
     def __str__(self):
         ret_str = "<NodeBuildData>\n"
@@ -51,8 +63,74 @@ class NodeData():
     def add_attr_data(self, *args):
         for attr_data in args:
             self.attr_values[attr_data.attr_name] = attr_data
+        self._add_attr_list = None
+
+    def clone(self):
+        """copy that can be edited without changing this node data. the 
+        compiled attribute list is shared
+
+        Returns:
+            NodeData:
+        """
+        node_data = NodeData(node=self.node, node_name=self.node_name, node_type=self.node_type, map_node_attr=self.map_node_attr)
+        node_data.attr_values = {x: self.attr_values[x].clone() for x in self.attr_values}
+        node_data._add_attr_list = self._add_attr_list
+        return node_data
+
+    def get_add_attr_list(self):
+        """compiles the dynamic attributes into Node.add_attr arguments 
+        for nw.CreatePlan.add_attrs. compound attributes are given their 
+        number of children and input and output are removed if they 
+        have none
+
+        Returns:
+            tuple(tuple(str, dict)): attribute name and kwargs
+        """
+        if self._add_attr_list is not None:
+            return self._add_attr_list
+
+        # getNumParents
+        compound_num_children_dict = {}
+        for attr_key in self.attr_values:
+            attr_data = self.attr_values[attr_key]
+            if attr_data.add_attr_kwargs is not None and "parent" in attr_data.add_attr_kwargs.keys():
+                attr_name = attr_data.add_attr_kwargs["parent"]
+                if attr_name not in compound_num_children_dict.keys():
+                    compound_num_children_dict[attr_name] = 0
+                
+                compound_num_children_dict[attr_name] += 1
+
+        # remove input and output compound attrs if no children were found
+        for attr_name in ["input", "output"]:
+            if attr_name not in compound_num_children_dict.keys() and attr_name in self.attr_values:
+                if self.attr_values[attr_name].add_attr_kwargs is not None:
+                    self.attr_values.pop(attr_name)
+
+        add_attr_list = []
+        for attr_key in self.attr_values:
+            attr_data = self.attr_values[attr_key]
+            if attr_data.add_attr_kwargs is not None and attr_data.add_attr_kwargs != {}:
+                add_attr_kwargs = dict(attr_data.add_attr_kwargs)
+                if attr_data.attr_name in compound_num_children_dict.keys() and add_attr_kwargs["type"] =="compound":
+                    add_attr_kwargs["numberOfChildren"] = compound_num_children_dict[attr_data.attr_name]
+                if add_attr_kwargs["type"] !="compound" or "numberOfChildren" in add_attr_kwargs.keys():
+                    add_attr_list.append((attr_data.attr_name, add_attr_kwargs))
+
+        self._add_attr_list = tuple(add_attr_list)
+        return self._add_attr_list
 
 class NodeBuildDataDict(dict):
+    def clone(self):
+        """copy with every node data cloned
+
+        Returns:
+            NodeBuildDataDict:
+        """
+        node_data_dict = NodeBuildDataDict()
+        for node_key in self.keys():
+            node_data_dict[node_key] = self[node_key].clone()
+        return node_data_dict
+
     def add_node_data(self, node_data:NodeData, key=None):
         if key is not None:
             self[key] = node_data
@@ -66,54 +144,29 @@ class NodeBuildDataDict(dict):
 
     def create_nodes(self, namespace=":"):
         namespace = utils.Namespace.add_outer_colons(namespace)
+        create_plan = nw.CreatePlan()
+        planned_nodes = {}
 
         for node_key in self.keys():
             node_data = self[node_key]
 
-            if node_data.node is None:
+            node = node_data.node
+            if node is None:
                 node_name = utils.Namespace.strip_namespace(name = str(node_data.node_name))
                 node_name = namespace + node_name
                 node_data.node_name = node_name
-            
-            
 
-            if node_data.node is None:
                 # create node
-                if node_data.node_type == "container":
-                    node_data.node = nw.Container.create_node(node_data.node_name)
-                else:
-                    node_data.node = nw.Node.create_node(node_data.node_type, node_data.node_name)
-
-            # getNumParents
-            compound_num_children_dict = {}
-            # get the keys
-            for attr_key in node_data.attr_values:
-                attr_data = node_data.attr_values[attr_key]
-                if attr_data.add_attr_kwargs is not None and "parent" in attr_data.add_attr_kwargs.keys():
-                    attr_name = attr_data.add_attr_kwargs["parent"]
-                    if attr_name not in compound_num_children_dict.keys():
-                        compound_num_children_dict[attr_name] = 0
-                    
-                    compound_num_children_dict[attr_name] += 1
-
-
-            # remove input and output compound attrs if no children were found
-            if "input" not in compound_num_children_dict.keys() and "input" in node_data.attr_values:
-                if node_data.attr_values["input"].add_attr_kwargs is not None:
-                    node_data.attr_values.pop("input")
-            if "output" not in compound_num_children_dict.keys() and "output" in node_data.attr_values:
-                if node_data.attr_values["output"].add_attr_kwargs is not None:
-                    node_data.attr_values.pop("output")
+                node = create_plan.add_node(node_data.node_type, node_data.node_name)
+                planned_nodes[node_key] = node
 
             # add attrs
-            node = node_data.node
-            for attr_key in node_data.attr_values:
-                attr_data = node_data.attr_values[attr_key]
-                if attr_data.add_attr_kwargs is not None and attr_data.add_attr_kwargs != {}:
-                    if attr_data.attr_name in compound_num_children_dict.keys() and attr_data.add_attr_kwargs["type"] =="compound":
-                        attr_data.add_attr_kwargs["numberOfChildren"] = compound_num_children_dict[attr_data.attr_name]
-                    if attr_data.add_attr_kwargs["type"] !="compound" or "numberOfChildren" in attr_data.add_attr_kwargs.keys():
-                        node.add_attr(attr_data.attr_name, **attr_data.add_attr_kwargs)         
+            create_plan.add_attrs(node, node_data.get_add_attr_list())
+
+        create_plan.execute()
+
+        for node_key in planned_nodes:
+            self[node_key].node = nw.derive_node(planned_nodes[node_key])
 
     def connect_nodes(self):
         for node_key in self.keys():
@@ -284,6 +337,11 @@ class HierAttrNames(Enum):
     output_world_matrix = "outputWorldMatrix"
     output_local_matrix = "outputLocalMatrix"
 class HierData:
+    # names of the child attributes of a hier attribute
+    hier_child_names = frozenset([x.value for x in HierAttrNames])
+    # compound attribute hash -> (om2.MObjectHandle, is hier attr)
+    _hier_attr_cache = {}
+    _hier_attr_cache_limit = 4096
     
     def __init__(self):
         pass
@@ -312,8 +370,39 @@ class HierData:
 
     @classmethod
     def is_hier_attr(cls, attr):
-        attr_data = [x.attr_name for x in cls.hier_creation_data()]
-        for attr_name in attr_data:
-            if not attr.has_attr(attr_name):
-                return False
-        return True
\ No newline at end of file
+        """whether attr is a compound with all of the hier child 
+        attributes. the result is cached per attribute definition
+
+        Args:
+            attr (nw.Attr):
+
+        Returns:
+            bool:
+        """
+        plug = attr.plug
+        if plug.isArray or not plug.isCompound:
+            return False
+
+        compound_attr = plug.attribute()
+        handle = om2.MObjectHandle(compound_attr)
+        cached = cls._hier_attr_cache.get(handle.hashCode())
+        if cached is not None and cached[0].isValid() and cached[0].object() == compound_attr:
+            return cached[1]
+
+        compound_fn = om2.MFnCompoundAttribute(compound_attr)
+        child_names = set([om2.MFnAttribute(compound_fn.child(index)).name for index in range(compound_fn.numChildren())])
+        is_hier_attr = cls.hier_child_names.issubset(child_names)
+        if len(cls._hier_attr_cache) >= cls._hier_attr_cache_limit:
+            cls._prune_hier_attr_cache()
+        cls._hier_attr_cache[handle.hashCode()] = (handle, is_hier_attr)
+        return is_hier_attr
+
+    @classmethod
+    def _prune_hier_attr_cache(cls):
+        """drops the entries of deleted attributes. clears the cache if 
+        it's still over the limit
+        """
+        for hash_code in [x for x in cls._hier_attr_cache if not cls._hier_attr_cache[x][0].isValid()]:
+            del cls._hier_attr_cache[hash_code]
+        if len(cls._hier_attr_cache) >= cls._hier_attr_cache_limit:
+            cls._hier_attr_cache.clear()
\ No newline at end of file
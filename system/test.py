@@ -299,4 +299,27 @@ def test():
     #     direction=utils_enum.AxisEnums.x, dynamic=True)
 
     # hier_component = components.HierComponent.get_instance(char_inst)
-    # hier_component.add_hiers(leg_anim_inst, arm_anim_inst, spine_anim_inst, *mirror_components)
\ No newline at end of file
+    # hier_component.add_hiers(leg_anim_inst, arm_anim_inst, spine_anim_inst, *mirror_components)
+
+def test_delete_locked_connection():
+    """deletes a node driving a locked attr with DeletePlan, then undoes
+    and redoes it. the attr has to come back connected and stay locked
+    """
+    cmds.file(new=True, force=True)
+    src_node = nw.Node.create_node("transform", name="lockSrc")
+    dest_node = nw.Node.create_node("transform", name="lockDest")
+    src_node["translate"] >> dest_node["translate"]
+    dest_node["translate"].set_locked(True)
+
+    src_node.delete_node()
+    assert not cmds.objExists("lockSrc"), "lockSrc was not deleted"
+    assert not cmds.listConnections("lockDest.translate", source=True, destination=False), "lockDest.translate is still connected"
+    assert cmds.getAttr("lockDest.translate", lock=True), "lockDest.translate was not relocked"
+
+    cmds.undo()
+    assert cmds.isConnected("lockSrc.translate", "lockDest.translate"), "undo did not reconnect lockDest.translate"
+    assert cmds.getAttr("lockDest.translate", lock=True), "lockDest.translate was not relocked after undo"
+
+    cmds.redo()
+    assert not cmds.objExists("lockSrc"), "redo did not delete lockSrc"
+    assert cmds.getAttr("lockDest.translate", lock=True), "lockDest.translate was not relocked after redo"
@@ -5,6 +5,7 @@
 import os
 import sys
 import types
+import contextlib
 
 from maya import cmds
 from maya.api import OpenMaya as om
@@ -14,6 +15,12 @@ __version__ = "0.2.2"
 # Public API
 __all__ = [
     "commit",
+    "journal",
+    "flush",
+    "add_flush_hook",
+    "run",
+    "disabled",
+    "is_enabled",
     "install",
     "uninstall",
 ]
@@ -41,15 +48,176 @@ shared.undo = None
 shared.redo = None
 
 
+# (undo, redo) pairs collected while a journal is open
+_journal = None
+
+# False while undo capture is disabled
+_enabled = True
+
+# name -> function committing work held outside the journal, run by `flush`
+_flush_hooks = {}
+
+
 def commit(undo, redo=lambda: None):
     """Commit `undo` and `redo` to history
 
+    Within a `journal()` the pair is collected and committed together
+    with the rest of the journal when it closes.
+
     Arguments:
         undo (func): Call this function on next undo
         redo (func, optional): Like `undo`, for for redo
 
     """
 
+    if not _enabled:
+        return
+
+    if _journal is not None:
+        _journal.append((undo, redo))
+        return
+
+    _commit(undo, redo)
+
+
+def is_enabled():
+    """Return whether commits are currently recorded"""
+
+    return _enabled
+
+
+@contextlib.contextmanager
+def disabled():
+    """Skip undo capture within the scope
+
+    Commits are dropped and Maya's undo queue is turned off (without
+    flushing it) until the scope exits. For batch builds nobody undoes.
+
+    Maya leaves undo chunks opened before the scope untouched, and the
+    scope's edits aren't recorded in them. Turning undo back on is
+    skipped if the undo state was changed within the scope.
+
+    """
+
+    global _enabled
+
+    if not _enabled:
+        yield
+        return
+
+    undo_state = cmds.undoInfo(query=True, state=True)
+    _enabled = False
+    cmds.undoInfo(stateWithoutFlush=False)
+    try:
+        yield
+    finally:
+        _enabled = True
+        # leave a state set within the scope as is
+        if not cmds.undoInfo(query=True, state=True):
+            cmds.undoInfo(stateWithoutFlush=undo_state)
+
+
+@contextlib.contextmanager
+def journal():
+    """Coalesce the commits made within the scope into as few commands as possible
+
+    The scope is wrapped in an undo chunk, so it undoes as one step
+    together with the commands run through `cmds`. Inside the chunk,
+    the commits made between two `flush` calls become one record;
+    every `run` (i.e. every `cmds` edit) closes the current record, so
+    the chunk holds about one record per `cmds` edit rather than one
+    for the whole scope. Nested journals join the outermost one.
+
+    """
+
+    global _journal
+
+    if _journal is not None:
+        yield
+        return
+
+    _journal = []
+    cmds.undoInfo(openChunk=True)
+    try:
+        yield
+    finally:
+        records, _journal = _journal, None
+        try:
+            _commit_records(records)
+        finally:
+            cmds.undoInfo(closeChunk=True)
+
+
+def add_flush_hook(name, func):
+    """Run `func` at the start of every `flush`
+
+    For callers holding their own pending records, e.g. an open
+    transaction, so those are committed in order too. Adding a hook
+    under an existing name replaces it.
+
+    Arguments:
+        name (str): Key of the hook
+        func (func): Commits the caller's pending records
+
+    """
+
+    _flush_hooks[name] = func
+
+
+def flush():
+    """Commit the records journaled so far as a single command
+
+    Call this before a `cmds` command that depends on or invalidates
+    what the pending records refer to, e.g. editing a created node or
+    deleting a node, so undo and redo replay in order.
+
+    """
+
+    for hook in list(_flush_hooks.values()):
+        hook()
+
+    if not _journal:
+        return
+
+    records = _journal[:]
+    del _journal[:]
+    _commit_records(records)
+
+
+def run(func, *args, **kwargs):
+    """Flush, then call a `cmds` command that edits the scene
+
+    Use this for every scene edit made through `cmds` or `mel` while
+    records may be pending, so the command lands after them in Maya's
+    undo queue.
+
+    Arguments:
+        func (func): e.g. `cmds.parent`
+        *args: Passed to `func`
+        **kwargs: Passed to `func`
+
+    """
+
+    flush()
+    return func(*args, **kwargs)
+
+
+def _commit_records(records):
+    if not records:
+        return
+
+    def undo():
+        for record_undo, _ in reversed(records):
+            record_undo()
+
+    def redo():
+        for _, record_redo in records:
+            record_redo()
+
+    _commit(undo, redo)
+
+
+def _commit(undo, redo):
     if not hasattr(cmds, command):
         install()
 
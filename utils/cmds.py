@@ -21,7 +21,7 @@ def command_parse(function, *args, **kwargs):
         return []
 
 def ls(*args, **kwargs):
-    return [nw.Node(x) for x in command_parse(cmds.ls, *args, **kwargs)]
+    return nw.resolve_nodes(command_parse(cmds.ls, *args, **kwargs))
 
 def select(*args, **kwargs):
-    return [nw.Node(x) for x in command_parse(cmds.select, *args, **kwargs)]
+    return nw.resolve_nodes(command_parse(cmds.select, *args, **kwargs))
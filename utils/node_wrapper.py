@@ -1,6 +1,10 @@
 from maya.api import OpenMaya as om2
 import maya.cmds as cmds
+import maya.mel as mel
 from typing import Union
+import contextlib
+import functools
+import weakref
 import utils.utils as utils
 import utils.apiundo as apiundo
 
@@ -10,9 +14,456 @@ def derive_node(arg):
         return Container(node)
     return node
 
+def _resolve_selection(names, get_item):
+    """loads names into a single MSelectionList and returns an item per
+    name. duplicate names are only resolved once
+
+    Args:
+        names (list(str)):
+        get_item (function): gets the item from (MSelectionList, index)
+
+    Raises:
+        RuntimeError: if a name is missing or matches more than 1 object
+
+    Returns:
+        list:
+    """
+    resolved = {}
+    m_sel_list = om2.MSelectionList()
+    for name in names:
+        if name in resolved:
+            continue
+        sel_length = m_sel_list.length()
+        try:
+            m_sel_list.add(name)
+        except RuntimeError:
+            if len(cmds.ls(name)) > 1:
+                cmds.error("more than 1 object named {}".format(name))
+            cmds.error("{0} does not exist".format(name))
+
+        added = m_sel_list.length() - sel_length
+        if added > 1:
+            cmds.error("more than 1 object named {}".format(name))
+        elif added == 1:
+            resolved[name] = get_item(m_sel_list, sel_length)
+        else:
+            # merged with an item already in the list under another name
+            single_sel_list = om2.MSelectionList()
+            single_sel_list.add(name)
+            resolved[name] = get_item(single_sel_list, 0)
+    return [resolved[x] for x in names]
+
+def resolve_nodes(names):
+    """resolves a list of node names to Node in bulk
+
+    Args:
+        names (list(str)):
+
+    Returns:
+        list(Node):
+    """
+    return _resolve_selection([str(x) for x in names], lambda sel, i: Node(sel.getDependNode(i)))
+
+def resolve_attrs(names):
+    """resolves a list of attribute names (node.attr) to Attr in bulk
+
+    Args:
+        names (list(str)):
+
+    Returns:
+        list(Attr):
+    """
+    def get_attr(sel, i):
+        plug = sel.getPlug(i)
+        return Attr(Node(plug.node()), plug)
+    return _resolve_selection([str(x) for x in names], get_attr)
+
+def get_plug_key(plug: om2.MPlug):
+    """identity key of a plug (node hash, attribute hash, logical
+    indices of its array ancestors)
+
+    Args:
+        plug (om2.MPlug):
+
+    Returns:
+        tuple:
+    """
+    indices = []
+    curr_plug = plug
+    while True:
+        if curr_plug.isElement:
+            indices.append(curr_plug.logicalIndex())
+            curr_plug = curr_plug.array()
+        elif curr_plug.isChild:
+            curr_plug = curr_plug.parent()
+        else:
+            break
+    return (
+        om2.MObjectHandle(plug.node()).hashCode(),
+        om2.MObjectHandle(plug.attribute()).hashCode(),
+        tuple(indices)
+    )
+
+# addAttr flags that take no argument in mel
+_add_attr_switch_flags = {"multi", "usedAsColor", "usedAsFilename"}
+
+def _get_add_attr_flags(kwargs):
+    """maps Node.add_attr kwargs to addAttr flags
+
+    Args:
+        kwargs (dict):
+
+    Returns:
+        dict:
+    """
+    kwargs = dict(kwargs)
+    if "parent" in kwargs.keys():
+        if isinstance(kwargs["parent"], Attr):
+            kwargs["parent"] = kwargs["parent"].attr_name
+        else:
+            kwargs["parent"] = str(kwargs["parent"])
+
+    attr_type = kwargs.pop("type", "")
+    kwargs.pop("longName", None)
+
+    # dataType attribute
+    if attr_type in ["string", "nurbsCurve", "nurbsSurface", "mesh", "matrix"]:
+        kwargs["dataType"] = attr_type
+
+    # attributeType attribute
+    elif attr_type in ["compound", "message", "double", "long", "bool", "enum", "double3", "double2"]:
+        kwargs["attributeType"] = attr_type
+
+    return {utils.snake_to_camel(key): kwargs[key] for key in kwargs}
+
+def get_add_attr_cmd(long_name, **kwargs):
+    """compiles Node.add_attr arguments into a mel addAttr command 
+    missing its node name, to be run with Node.add_attrs
+
+    Args:
+        long_name (str):
+
+    Returns:
+        str:
+    """
+    cmd_parts = ["addAttr", "-longName", _mel_str(long_name)]
+    flags = _get_add_attr_flags(kwargs)
+    for flag in flags:
+        value = flags[flag]
+        if flag in _add_attr_switch_flags:
+            if value:
+                cmd_parts.append("-" + flag)
+        elif isinstance(value, bool):
+            cmd_parts.extend(["-" + flag, "true" if value else "false"])
+        elif isinstance(value, (int, float)):
+            cmd_parts.extend(["-" + flag, repr(value)])
+        else:
+            cmd_parts.extend(["-" + flag, _mel_str(value)])
+    return " ".join(cmd_parts)
+
+def _mel_str(value):
+    """quotes value as a mel string
+
+    Args:
+        value (str):
+
+    Returns:
+        str:
+    """
+    return '"{}"'.format(str(value).replace("\\", "\\\\").replace('"', '\\"'))
+
+class LockManager():
+    """
+    Unlocks plugs for the duration of a scope and relocks the ones that
+    were locked in one pass on exit. lock state is read once per plug
+    """
+    """
+    Attributes:
+    locked_plugs (list(om2.MPlug)): plugs unlocked by the manager
+    """
+    def __init__(self, *plugs):
+        self.locked_plugs = []
+        self.add(*plugs)
+
+    def add(self, *plugs):
+        """unlocks plugs (or Attr) if locked
+
+        Args:
+            plugs (Union[om2.MPlug, Attr]):
+        """
+        for plug in plugs:
+            if isinstance(plug, Attr):
+                plug = plug.plug
+            if plug.isLocked:
+                plug.isLocked = False
+                self.locked_plugs.append(plug)
+
+    def restore(self):
+        """relocks unlocked plugs
+        """
+        for plug in self.locked_plugs:
+            plug.isLocked = True
+        self.locked_plugs = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.restore()
+
+class Transaction():
+    """
+    Collects connections, disconnections and value sets into a single
+    MDGModifier with a single undo record
+    """
+    """
+    Attributes:
+    dg_mod (om2.MDGModifier): modifier the next edit is added to
+    plugs (list(om2.MPlug)): plugs edited by the transaction
+    """
+    def __init__(self):
+        self._dg_mods = [om2.MDGModifier()]
+        self.plugs = []
+
+    @property
+    def dg_mod(self):
+        return self._dg_mods[-1]
+
+    def _do_it(self):
+        # only the operations added since the last doIt are executed
+        # so reads inside the transaction see every edit made so far
+        try:
+            self.dg_mod.doIt()
+        except:
+            # a failed operation stays queued on its modifier so the
+            # following edits go to a new one
+            self._dg_mods.append(om2.MDGModifier())
+            raise
+
+    def connect(self, src_plug: om2.MPlug, dest_plug: om2.MPlug):
+        # the connection gets its own modifier so a failed connect
+        # leaves neither it nor the disconnect queued
+        dg_mod = om2.MDGModifier()
+        # matches connectAttr force by replacing the current source
+        if dest_plug.isDestination:
+            curr_src_plug = dest_plug.source()
+            if curr_src_plug == src_plug:
+                return
+            dg_mod.disconnect(curr_src_plug, dest_plug)
+        dg_mod.connect(src_plug, dest_plug)
+        try:
+            dg_mod.doIt()
+        except:
+            # reconnects the source if the disconnect went through
+            try:
+                dg_mod.undoIt()
+            except:
+                pass
+            raise
+        self._dg_mods.extend([dg_mod, om2.MDGModifier()])
+        self.plugs.extend([src_plug, dest_plug])
+
+    def disconnect(self, src_plug: om2.MPlug, dest_plug: om2.MPlug):
+        self.dg_mod.disconnect(src_plug, dest_plug)
+        self.plugs.extend([src_plug, dest_plug])
+        self._do_it()
+
+    def set_plug_value(self, plug: om2.MPlug, value_type: str, value):
+        """queues a value set on the modifier. returns False when the
+        value type can't be set through the modifier
+
+        Args:
+            plug (om2.MPlug):
+            value_type (str): PlugValue type of the plug
+            value ():
+
+        Returns:
+            bool:
+        """
+        if value_type == "string":
+            if value is None:
+                value = ""
+            elif not isinstance(value, str):
+                value = str(value)
+            self.dg_mod.newPlugValueString(plug, value)
+        elif value_type == "matrix":
+            matrix_data = om2.MFnMatrixData().create(om2.MMatrix(value))
+            self.dg_mod.newPlugValue(plug, matrix_data)
+        elif value_type == "angle":
+            self.dg_mod.newPlugValueMAngle(plug, om2.MAngle(value, om2.MAngle.kDegrees))
+        elif value_type == "bool":
+            self.dg_mod.newPlugValueBool(plug, bool(value))
+        elif value_type in ["int", "enum"]:
+            self.dg_mod.newPlugValueInt(plug, int(value))
+        elif value_type == "double":
+            self.dg_mod.newPlugValueDouble(plug, value)
+        else:
+            return False
+        self.plugs.append(plug)
+        self._do_it()
+        return True
+
+    def commit(self):
+        """registers the edits made so far as one undo record. later 
+        edits go to a new record
+        """
+        if self.plugs == []:
+            return
+        dg_mods = self._dg_mods
+        plugs = self.plugs
+        self._dg_mods = [om2.MDGModifier()]
+        self.plugs = []
+
+        def undo():
+            with LockManager(*plugs):
+                for dg_mod in dg_mods[::-1]:
+                    dg_mod.undoIt()
+        def redo():
+            with LockManager(*plugs):
+                for dg_mod in dg_mods:
+                    try:
+                        dg_mod.doIt()
+                    except:
+                        pass
+        apiundo.commit(
+            redo = redo,
+            undo = undo
+        )
+
+_transaction_stack = []
+
+def get_transaction():
+    """returns the active transaction. returns None if there is none
+
+    Returns:
+        Union[Transaction, None]:
+    """
+    if _transaction_stack:
+        return _transaction_stack[-1]
+    return None
+
+@contextlib.contextmanager
+def transaction():
+    """Batches every connect, disconnect and set issued through Attr
+    inside the scope into one modifier and one undo record. nested
+    transactions join the outermost one
+
+    ie. with nw.transaction():
+            node["attr"] >> other["attr"]
+    """
+    if _transaction_stack:
+        yield _transaction_stack[0]
+        return
+
+    current_transaction = Transaction()
+    _transaction_stack.append(current_transaction)
+    try:
+        yield current_transaction
+    finally:
+        _transaction_stack.pop()
+        current_transaction.commit()
+
+def _flush_transaction():
+    """commits the active transaction's edits so far so they keep their
+    place in the undo queue
+    """
+    if _transaction_stack:
+        _transaction_stack[0].commit()
+
+apiundo.add_flush_hook("node_wrapper.transaction", _flush_transaction)
+
+# wrapper class -> {MObjectHandle hash code: wrapper}
+_intern_tables = {}
+
+# remove callbacks from a previous import of the module
+if "_callback_ids" in globals():
+    om2.MMessage.removeCallbacks(_callback_ids)
+_callback_ids = []
+
+def _on_node_removed(mobject, client_data):
+    """drops wrappers of a deleted node from the intern tables
+
+    Args:
+        mobject (om2.MObject): node being removed
+        client_data ():
+    """
+    key = om2.MObjectHandle(mobject).hashCode()
+    for intern_table in _intern_tables.values():
+        intern_table.pop(key, None)
+    if _container_index is not None:
+        _container_index.remove_node(key)
+
+def _on_connection(src_plug, dest_plug, made, client_data):
+    """updates the container index when a node is added to or removed
+    from a container (member.message -> hyperLayout.hyperPosition[].dependNode)
+
+    Args:
+        src_plug (om2.MPlug):
+        dest_plug (om2.MPlug):
+        made (bool): True if connected, False if disconnected
+        client_data ():
+    """
+    if _container_index is None or dest_plug.node().apiType() != om2.MFn.kHyperLayout:
+        return
+    if om2.MFnAttribute(dest_plug.attribute()).name != "dependNode":
+        return
+    _container_index.update_membership(src_plug.node(), dest_plug.node(), made)
+
+def _on_scene_changed(client_data):
+    if _container_index is not None:
+        _container_index.set_dirty()
+    utils.Namespace.reset_index()
+
+def _on_container_attr_changed(mobject, attr_name, state, client_data):
+    """clears the published attr map of a container when an attribute 
+    is published, unpublished, bound or unbound
+
+    Args:
+        mobject (om2.MObject): container node
+        attr_name (str): published name
+        state (bool):
+        client_data ():
+    """
+    container = _intern_tables.get(Container, {}).get(om2.MObjectHandle(mobject).hashCode())
+    if container is not None:
+        container.clear_published_attr_cache()
+
+def _install_callbacks():
+    if _callback_ids:
+        return
+    _callback_ids.append(om2.MDGMessage.addNodeRemovedCallback(_on_node_removed, "dependNode"))
+    _callback_ids.append(om2.MContainerMessage.addPublishAttrCallback(_on_container_attr_changed))
+    _callback_ids.append(om2.MContainerMessage.addBoundAttrCallback(_on_container_attr_changed))
+    _callback_ids.append(om2.MDGMessage.addConnectionCallback(_on_connection))
+    for message in [om2.MSceneMessage.kAfterNew, om2.MSceneMessage.kAfterOpen, 
+                    om2.MSceneMessage.kAfterImport, om2.MSceneMessage.kAfterCreateReference,
+                    om2.MSceneMessage.kAfterRemoveReference]:
+        _callback_ids.append(om2.MSceneMessage.addCallback(message, _on_scene_changed))
+
+_container_index = None
+
+def get_container_index():
+    """returns the scene's container index
+
+    Returns:
+        ContainerIndex:
+    """
+    global _container_index
+    if _container_index is None:
+        _install_callbacks()
+        _container_index = ContainerIndex()
+    return _container_index
+
+def _get_intern_table(cls):
+    if cls not in _intern_tables:
+        _install_callbacks()
+        _intern_tables[cls] = weakref.WeakValueDictionary()
+    return _intern_tables[cls]
+
 class Node():
     """
-    A Class encapsulating a node
+    A Class encapsulating a node. wrapping the same node with the same
+    class returns the same instance
     """
     """
     Attributes:
@@ -20,17 +471,33 @@ class Node():
     name (str): returns node name ie. name
     type (str): node type
     """
+    def __new__(cls, node):
+        mobject = utils.get_mobject(node)
+        if mobject is None:
+            cmds.error("node {0} does not exist".format(node))
+        handle = om2.MObjectHandle(mobject)
+        intern_table = _get_intern_table(cls)
+
+        instance = intern_table.get(handle.hashCode())
+        if instance is not None and instance._handle.isValid() and instance._handle.object() == mobject:
+            return instance
+
+        instance = super(Node, cls).__new__(cls)
+        instance._handle = handle
+        instance._hash = handle.hashCode()
+        intern_table[handle.hashCode()] = instance
+        return instance
+
     def __init__(self, node):
         """_summary_
 
         Args:
             node ():
         """
-        if isinstance(node, str):
-            if not cmds.objExists(node):
-                cmds.error("node {0} does not exist".format(node))
-                return
-        self._dep_node = utils.get_dep_node(node)
+        # interned instances are already initialized
+        if hasattr(self, "_dep_node"):
+            return
+        self._dep_node = om2.MFnDependencyNode(self._handle.object())
         self.__attr_cache = {}
         self.__full_attr_list = None
     
@@ -60,66 +527,60 @@ class Node():
             name (str):
         """
         if name:
-            return Node(cmds.createNode(node_type, name=name))
-        return Node(cmds.createNode(node_type))
+            return Node(apiundo.run(cmds.createNode, node_type, name=name))
+        return Node(apiundo.run(cmds.createNode, node_type))
     
     @staticmethod
     def exists(node):
         return cmds.objExists(str(node))
 
     def has_attr(self, attr_name):
-        try:
-            self.__getitem__(attr_name)
-            return True
-        except:
-            return False
+        return self._find_attr(attr_name) is not None
 
     def obj_exists(self):
         return cmds.objExists(str(self))
 
-    def add_attr(self, long_name="", **kwargs):
-        if "parent" in kwargs.keys():
-            if isinstance(kwargs["parent"], Attr):
-                kwargs["parent"] = kwargs["parent"].attr_name
-            else:
-                kwargs["parent"] = str(kwargs["parent"])
-
-        attr_type=""
-        if "type" in kwargs.keys():
-            attr_type=kwargs["type"]
-            kwargs.pop("type")
-        if "longName" in kwargs.keys():
-            kwargs.pop("longName")
-        
-        # dataType attribute
-        if attr_type in ["string", "nurbsCurve", "nurbsSurface", "mesh", "matrix"]:
-            kwargs["dataType"] = attr_type
+    def is_valid(self):
+        """returns False once the node has been deleted
 
-        # attributeType attribute
-        elif attr_type in ["compound", "message", "double", "long", "bool", "enum", "double3", "double2"]:
-            kwargs["attributeType"] = attr_type
+        Returns:
+            bool:
+        """
+        return self._handle.isValid()
 
-        new_kwargs = {}
-        for key in kwargs:
-            new_kwargs[utils.snake_to_camel(key)] = kwargs[key]
+    def add_attr(self, long_name="", **kwargs):
+        apiundo.run(cmds.addAttr, str(self), longName=long_name, **_get_add_attr_flags(kwargs))
+
+    def add_attrs(self, add_attr_cmds):
+        """adds attributes from get_add_attr_cmd commands in one mel call
 
-        cmds.addAttr(str(self), longName=long_name, **new_kwargs)
+        Args:
+            add_attr_cmds (list(str)):
+        """
+        if len(add_attr_cmds) == 0:
+            return
+        node_name = _mel_str(self)
+        apiundo.run(mel.eval, "".join(["{} {};".format(add_attr_cmd, node_name) for add_attr_cmd in add_attr_cmds]))
         
 
     def delete_attr(self, attr):
-        cmds.deleteAttr(str(self), at=attr)
+        apiundo.run(cmds.deleteAttr, str(self), at=attr)
+        self.__attr_cache = {}
+        self.__full_attr_list = None
 
     def get_connection_list(self, asSource, asDestination):
         connections = set()
         if asSource:
             connection_list = cmds.listConnections(str(self), connections=True, source=True, destination=False, plugs=True)
             if connection_list is not None:
-                connection_list = [(Attr(None, x), Attr(self, y)) for x, y in zip(connection_list[1::2], connection_list[::2])]
+                connection_list = resolve_attrs(connection_list)
+                connection_list = [(x, y) for x, y in zip(connection_list[1::2], connection_list[::2])]
                 connections.update(connection_list)
         if asDestination:
             connection_list = cmds.listConnections(str(self), connections=True, source=False, destination=True, plugs=True)
             if connection_list is not None:
-                connection_list = [(Attr(self, x), Attr(None, y)) for x, y in zip(connection_list[::2], connection_list[1::2])]
+                connection_list = resolve_attrs(connection_list)
+                connection_list = [(x, y) for x, y in zip(connection_list[::2], connection_list[1::2])]
                 connections.update(connection_list)
         if self.node_type == "container":
             self_container = Container(self)
@@ -155,45 +616,16 @@ class Node():
         if not self.obj_exists():
             return
         if not clean:
-            cmds.delete(str(self))
-
-        # delete history
-        cmds.delete(str(self), constructionHistory=True)
-        children = cmds.listRelatives(str(self), allDescendents=True)
-
-        all_children = [self]
-        if children is not None:
-            all_children.extend([Node(x) for x in children])
-
-        # unpublish
-        node_container = self.get_container()
-        if node_container is not None:
-            publish_attrs = node_container.get_published_attrs()
-            filter_publish_attrs = [x for x in publish_attrs if x.node == self]
-            for attr in filter_publish_attrs:
-                node_container.unpublish_attr(attr)
-
-        # loop from child to parent
-        for node in all_children[::-1]:
-            # if container delete outside connections
-            if node.node_type == "container":
-                self_container = Container(node=node)
-                connections = self_container.get_external_connection_list()
-                for _, dest in connections:
-                    ~dest
-
-            # delete connections
-            connections = node.get_connection_list(True, True)
-            for _, dest in connections:
-                ~dest
-
-            cmds.delete(str(node))
+            # journaled edits have to be committed before the nodes they refer to are deleted
+            apiundo.run(cmds.delete, str(self))
+            return
+
+        delete_plan = DeletePlan()
+        delete_plan.add_nodes(self)
+        delete_plan.execute()
 
     def get_container(self):
-        container = cmds.container(findContainer=self.full_name, query=True)
-        if container is not None:
-            return Container(container)
-        return container
+        return get_container_index().get_container(self.mobject)
 
     def get_top_level_attribute_list(self, reCache=False):
         """gets a list of top level attr for the node
@@ -233,11 +665,14 @@ class Node():
             new_name (str):
         """
         curr_name = self.name
+        # keeps the rename in execution order with the journaled records and commands around it
+        apiundo.flush()
         self._dep_node.setName(new_name)
         apiundo.commit(
             undo=lambda: self._dep_node.setName(curr_name),
             redo=lambda: self._dep_node.setName(new_name)
         )
+        apiundo.flush()
 
     # operator overloads
     def __str__(self):
@@ -256,13 +691,7 @@ class Node():
         Returns:
             Attr: returns Attr class of node"s attribute
         """
-        attr_instance = None
-        try:
-            attr_instance = self._get_cached_attr(attr)
-        except:
-            raise RuntimeError("{0}.{1} attribute not found".format(self.name, attr))
-
-        return attr_instance
+        return self._get_cached_attr(attr)
     def __setitem__(self, attr: str, new_value):
         """sets the attribute"s value of a given node
 
@@ -283,10 +712,36 @@ class Node():
         Returns:
             Attr: returns Attr class of nodes attribute
         """
-        if attr not in self.__attr_cache.keys():
-            self.__attr_cache[attr] = Attr(self, utils.get_plug(
-                self._dep_node, attr))
-        return self.__attr_cache[attr]
+        attr_instance = self._find_attr(attr)
+        if attr_instance is None:
+            raise RuntimeError("{0}.{1} attribute not found".format(self.name, attr))
+        return attr_instance
+
+    def _find_attr(self, attr):
+        """gets the attr from the cache or the node without raising. 
+        found attrs are cached. cached attrs are dropped once their root
+        attribute is gone (ie. an undone addAttr)
+
+        Args:
+            attr (str): attribute name
+
+        Returns:
+            Union[Attr, None]:
+        """
+        attr_instance = self.__attr_cache.get(attr)
+        if attr_instance is not None:
+            attr_path = utils.parse_attr_path(attr)
+            if not attr_path or not self._dep_node.hasAttribute(attr_path[0]):
+                del self.__attr_cache[attr]
+                self.__full_attr_list = None
+                attr_instance = None
+        if attr_instance is None:
+            plug = utils.get_plug(self._dep_node, attr)
+            if plug is None:
+                return None
+            attr_instance = Attr(self, plug)
+            self.__attr_cache[attr] = attr_instance
+        return attr_instance
     
     def __eq__(self, other):
         """Returns True if the other object is of type Node and the 
@@ -299,21 +754,25 @@ class Node():
             bool: 
         """
         if isinstance(other, Node):
-            if str(self) == str(other):
+            if self is other:
                 return True
+            return self._hash == other._hash and self._handle.object() == other._handle.object()
             
         return False
     def __hash__(self):
-        return hash(self.full_name)
+        return self._hash
 
 class Container(Node):
     def __init__(self, node):
         super(Container, self).__init__(node)
+        # interned instances keep their cache
+        if not hasattr(self, "_published_attr_map"):
+            self._published_attr_map = None
 
     def get_nodes(self):
         child_nodes = cmds.container(str(self), query=True, nodeList=True)
         if child_nodes:
-            return [Node(x) for x in child_nodes]
+            return resolve_nodes(child_nodes)
 
     def lock(self, proprigate=False):
         if proprigate:
@@ -326,7 +785,7 @@ class Container(Node):
             container_list = [self]
 
         for container in container_list:
-            cmds.lockNode(str(container), lock=True, lockUnpublished=True)
+            apiundo.run(cmds.lockNode, str(container), lock=True, lockUnpublished=True)
 
     def unlock(self, proprigate=False):
         if proprigate:
@@ -341,7 +800,7 @@ class Container(Node):
 
         container_list = container_list[::-1]
         for container in container_list:
-            cmds.lockNode(str(container), lock=False, lockUnpublished=False)
+            apiundo.run(cmds.lockNode, str(container), lock=False, lockUnpublished=False)
 
     def __enter__(self):
         self.unlock()
@@ -358,13 +817,10 @@ class Container(Node):
             node_conversionNodes = cmds.ls(node_conversionNodes, type='unitConversion')
             conversionNodes.extend(node_conversionNodes)
         args.extend(conversionNodes)
-        cmds.container(str(self), addNode=args, edit=True, iha=include_hierarchy_above, ihb=include_hierarchy_below, inc=include_network, force=force)
+        apiundo.run(cmds.container, str(self), addNode=args, edit=True, iha=include_hierarchy_above, ihb=include_hierarchy_below, inc=include_network, force=force)
 
     def get_container(self):
-        containers = cmds.container(str(self),  query=True, parentContainer=True)
-        if containers is not None:
-            return Container(containers[0])
-        return containers
+        return get_container_index().get_container(self.mobject)
 
     def remove_nodes(self, *args):
         args = [str(x) for x in args]
@@ -373,59 +829,76 @@ class Container(Node):
             curr_remove_nodes = cmds.listRelatives(node, allDescendents=True)
             if curr_remove_nodes is not None:
                 remove_list.extend(curr_remove_nodes)
-        cmds.container(str(self), edit=True, removeNode=remove_list, force=True)
+        apiundo.run(cmds.container, str(self), edit=True, removeNode=remove_list, force=True)
 
     def publish_attr(self, attr, attr_bind_name:str):
         if attr.node in self.get_nodes():
-            cmds.container(str(self), edit=True, publishAndBind=[str(attr), attr_bind_name])
+            apiundo.run(cmds.container, str(self), edit=True, publishAndBind=[str(attr), attr_bind_name])
+            self.clear_published_attr_cache()
         else:
             raise RuntimeError("{} is not a node of container {}".format(attr.node, str(self)))
 
     def unpublish_attr(self, attr):
-        cmds.container(str(self), edit=True, unbindAndUnpublish=str(attr))
+        apiundo.run(cmds.container, str(self), edit=True, unbindAndUnpublish=str(attr))
+        self.clear_published_attr_cache()
 
-    def get_published_attr_map(self):
+    def clear_published_attr_cache(self):
+        self._published_attr_map = None
+
+    def _get_published_attr_map(self):
+        """gets the cached published name to Attr map. cleared when
+        attributes are published or bound
 
-        m_object = self.mobject
-        if m_object.hasFn(om2.MFn.kContainer):
-            mfn_container = om2.MFnContainerNode(m_object)
-            plug_list, attr_list = mfn_container.getPublishedPlugs()
-            return {x:Attr(None, y) for x, y in zip(attr_list, plug_list)}
-        return {}
+        Returns:
+            dict{str, Attr}:
+        """
+        if self._published_attr_map is None:
+            _install_callbacks()
+            m_object = self.mobject
+            self._published_attr_map = {}
+            if m_object.hasFn(om2.MFn.kContainer):
+                mfn_container = om2.MFnContainerNode(m_object)
+                plug_list, attr_list = mfn_container.getPublishedPlugs()
+                self._published_attr_map = {x:Attr(None, y) for x, y in zip(attr_list, plug_list)}
+        return self._published_attr_map
+
+    def get_published_attr_map(self):
+        return dict(self._get_published_attr_map())
 
     def get_published_attrs(self):
-        m_object = self.mobject
-        if m_object.hasFn(om2.MFn.kContainer):
-            mfn_container = om2.MFnContainerNode(m_object)
-            plug_list, _ = mfn_container.getPublishedPlugs()
-            return [Attr(None, x) for x in plug_list]
-        return []
+        return list(self._get_published_attr_map().values())
+
+    def get_member_hashes(self):
+        """gets a set of the hashes of the container's member nodes
+
+        Returns:
+            set(int):
+        """
+        return {x.hashCode() for x in get_container_index().get_members(self.mobject)}
 
     def get_external_connection_list(self):
-        container_nodes = self.get_nodes()
+        member_hashes = self.get_member_hashes()
         connection_list = []
 
         external_connection_list = cmds.container(str(self), query=True, connectionList=True)
-        if external_connection_list is None:
-            external_connection_list = []
-        for attr in external_connection_list:
-            curr_attr = Attr(None, attr)
-
-            if curr_attr.attr_type not in ["compound", "double3", "double2"] and curr_attr.__len__() is not None:
-                curr_attr = curr_attr[0]
-
-            input_connections = curr_attr.get_as_dest_connection_list()
-            output_connections = curr_attr.get_as_source_connection_list()
-            for input in input_connections:
-                if input.node in container_nodes:
-                    connection_list.append((input, curr_attr))
-            for output in output_connections:
-                if output.node in container_nodes:
-                    connection_list.append((curr_attr, output))
+        if not external_connection_list:
+            return connection_list
+        for curr_attr in resolve_attrs(external_connection_list):
+            plug = curr_attr.plug
+            if plug.isArray and not plug.isCompound:
+                plug = plug.elementByLogicalIndex(0)
+                curr_attr = Attr(curr_attr.node, plug)
+
+            for input_plug in plug.connectedTo(True, False):
+                if om2.MObjectHandle(input_plug.node()).hashCode() in member_hashes:
+                    connection_list.append((Attr(Node(input_plug.node()), input_plug), curr_attr))
+            for output_plug in plug.connectedTo(False, True):
+                if om2.MObjectHandle(output_plug.node()).hashCode() in member_hashes:
+                    connection_list.append((curr_attr, Attr(Node(output_plug.node()), output_plug)))
         return connection_list
 
     def get_child_containers(self, all=False):
-        sub_containers = [Container(x) for x in self.get_nodes() if x.node_type == "container"]
+        sub_containers = get_container_index().get_child_containers(self.mobject)
         return_child_containers = []
         if not all:
             return sub_containers
@@ -438,11 +911,10 @@ class Container(Node):
     @classmethod
     def create_node(cls, name:str=None):
         node = super(Container, cls).create_node("container", name)
-        node.__class__ = Container
-        return node
+        return Container(node)
 
     def __setitem__(self, attr: str, new_value):
-        publish_attr_map = self.get_published_attr_map()
+        publish_attr_map = self._get_published_attr_map()
         if attr in publish_attr_map.keys():
             attr = publish_attr_map[attr]
             attr.set(new_value)
@@ -450,7 +922,7 @@ class Container(Node):
             super().__setitem__(attr, new_value)
 
     def __getitem__(self, attr: str):
-        publish_attr_map = self.get_published_attr_map()
+        publish_attr_map = self._get_published_attr_map()
         if attr in publish_attr_map.keys():
             return publish_attr_map[attr]
         if attr.find("[") != -1 or attr.find(".") != -1:
@@ -467,37 +939,636 @@ class Container(Node):
                 if parent_attr in publish_attr_map.keys():
                     return publish_attr_map[parent_attr][back_attrs]
         return super().__getitem__(attr)
+
+    def has_attr(self, attr_name):
+        publish_attr_map = self._get_published_attr_map()
+        if attr_name in publish_attr_map.keys():
+            return True
+        if attr_name.find("[") != -1:
+            parent_attr, back_attrs = attr_name.split("[", 1)
+            if parent_attr in publish_attr_map.keys():
+                return publish_attr_map[parent_attr].has_attr("[" + back_attrs)
+        elif attr_name.find(".") != -1:
+            parent_attr, back_attrs = attr_name.split(".", 1)
+            if parent_attr in publish_attr_map.keys():
+                return publish_attr_map[parent_attr].has_attr(back_attrs)
+        return super().has_attr(attr_name)
         
     
-class AttrIter():
+class DeletePlan():
     """
-    Iterator for attr. Iterates through child attrs at a depth equal
-    to max depth
+    Plans a clean delete of nodes and their dag descendants. their
+    published attrs are unpublished, their connections are broken and 
+    they're deleted children first, all in one MDagModifier with one 
+    undo record
     """
     """
     Attributes:
-    parent_attr (Attr): 
-    current_attr (Attr): current child of parent attr
-    depth (int): depth of search
-    curr_index (int): index of the current elements
-    max_depth (int): max depth to stop at (and include)
+    dag_mod (om2.MDagModifier):
+    nodes (list(om2.MObjectHandle)): nodes to delete, parents before 
+    children
+    locked_plugs (list(om2.MPlug)): locked destination plugs of the 
+    planned disconnects
+    """
+    def __init__(self):
+        self.dag_mod = om2.MDagModifier()
+        self.nodes = []
+        self.locked_plugs = []
+        self._node_hashes = set()
+        self._connection_keys = set()
+
+    def add_nodes(self, *nodes):
+        """adds nodes and their dag descendants to the plan
+
+        Args:
+            nodes (Node):
+        """
+        nodes = [x for x in nodes if x.is_valid() and hash(x) not in self._node_hashes]
+        if nodes == []:
+            return
+        # delete history. journaled edits have to be committed before the nodes they refer to are deleted
+        apiundo.run(cmds.delete, [str(x) for x in nodes], constructionHistory=True)
+
+        container_index = get_container_index()
+        new_nodes = []
+        handles = [x._handle for x in nodes[::-1] if x.is_valid()]
+        while handles:
+            handle = handles.pop()
+            if handle.hashCode() in self._node_hashes:
+                continue
+            self._node_hashes.add(handle.hashCode())
+            self.nodes.append(handle)
+            new_nodes.append(handle)
+
+            # containers take their members with them
+            children = self._get_descendants(handle.object())
+            if handle.object().apiType() == om2.MFn.kContainer:
+                children.extend(container_index.get_members(handle.object()))
+            handles.extend(children[::-1])
+
+        self._plan_unpublish(new_nodes)
+        for handle in new_nodes:
+            self._plan_disconnect(handle.object())
+
+    @staticmethod
+    def _get_descendants(mobject: om2.MObject):
+        """dag children of mobject
+
+        Args:
+            mobject (om2.MObject):
+
+        Returns:
+            list(om2.MObjectHandle):
+        """
+        if not mobject.hasFn(om2.MFn.kDagNode):
+            return []
+        dag_fn = om2.MFnDagNode(mobject)
+        return [om2.MObjectHandle(dag_fn.child(i)) for i in range(dag_fn.childCount())]
+
+    def _plan_unpublish(self, handles):
+        """unpublishes the attrs of the nodes from their containers
+
+        Args:
+            handles (list(om2.MObjectHandle)):
+        """
+        container_index = get_container_index()
+        containers = {}
+        for handle in handles:
+            container = container_index.get_container(handle.object())
+            if container is not None:
+                containers[hash(container)] = container
+
+        for container in containers.values():
+            for attr in container.get_published_attrs():
+                if hash(attr.node) in self._node_hashes:
+                    self.dag_mod.commandToExecute('container -edit -unbindAndUnpublish "{}" "{}"'.format(
+                        str(attr), str(container)))
+
+    def _add_disconnect(self, src_plug: om2.MPlug, dest_plug: om2.MPlug):
+        if om2.MFn.kHyperLayout in [src_plug.node().apiType(), dest_plug.node().apiType()]:
+            return
+        connection_key = (get_plug_key(src_plug), get_plug_key(dest_plug))
+        if connection_key in self._connection_keys:
+            return
+        self._connection_keys.add(connection_key)
+        # a locked destination blocks the disconnect
+        if dest_plug.isLocked:
+            self.locked_plugs.append(dest_plug)
+        self.dag_mod.disconnect(src_plug, dest_plug)
+
+    def _plan_disconnect(self, mobject: om2.MObject):
+        """disconnects a node's connections. containers also disconnect
+        their external connections
+
+        Args:
+            mobject (om2.MObject):
+        """
+        published_keys = set()
+        if mobject.apiType() == om2.MFn.kContainer:
+            container = Container(mobject)
+            published_keys = {x._get_key() for x in container.get_published_attrs()}
+            for _, dest in container.get_external_connection_list():
+                for src_plug in dest.plug.connectedTo(True, False):
+                    self._add_disconnect(src_plug, dest.plug)
+
+        for plug in om2.MFnDependencyNode(mobject).getConnections():
+            for src_plug in plug.connectedTo(True, False):
+                if published_keys and {get_plug_key(src_plug), get_plug_key(plug)} & published_keys:
+                    continue
+                self._add_disconnect(src_plug, plug)
+            for dest_plug in plug.connectedTo(False, True):
+                if published_keys and {get_plug_key(plug), get_plug_key(dest_plug)} & published_keys:
+                    continue
+                self._add_disconnect(plug, dest_plug)
 
+    def execute(self):
+        """deletes the planned nodes with one undo record
+        """
+        if self.nodes == []:
+            return
+        for handle in self.nodes[::-1]:
+            if not handle.isValid():
+                continue
+            node = handle.object()
+            if node.apiType() == om2.MFn.kContainer:
+                # deleted through the command so its hyperLayout goes with it
+                self.dag_mod.commandToExecute('delete "{}"'.format(
+                    om2.MFnDependencyNode(node).uniqueName()))
+            elif node.hasFn(om2.MFn.kDagNode):
+                self.dag_mod.deleteNode(node, False)
+            else:
+                self.dag_mod.deleteNode(node)
+
+        dag_mod = self.dag_mod
+        # plugs on deleted nodes go with them, only the surviving ones are relocked
+        locked_plugs = [x for x in self.locked_plugs if om2.MObjectHandle(x.node()).hashCode() not in self._node_hashes]
+        def do_it():
+            with LockManager(*locked_plugs):
+                dag_mod.doIt()
+        def undo_it():
+            with LockManager(*locked_plugs):
+                dag_mod.undoIt()
+
+        # journaled edits have to be committed before the nodes they refer to are deleted
+        apiundo.flush()
+        do_it()
+        apiundo.commit(
+            undo = undo_it,
+            redo = do_it
+        )
+        # the commands that follow (ie. deleting namespaces) have to come after the delete in the undo queue
+        apiundo.flush()
+        self.dag_mod = om2.MDagModifier()
+        self.nodes = []
+        self.locked_plugs = []
+        self._node_hashes = set()
+        self._connection_keys = set()
+
+class RenamePlan():
+    """
+    Collects node renames and applies the ones that change a name in 
+    one MDGModifier with one undo record
+    """
+    """
+    Attributes:
+    dg_mod (om2.MDGModifier):
+    renames (list(tuple(Node, str))): node and new name
+    """
+    def __init__(self):
+        self.dg_mod = om2.MDGModifier()
+        self.renames = []
+
+    def add(self, node, new_name:str):
+        """adds a rename if new_name differs from the node's name
+
+        Args:
+            node (Node):
+            new_name (str): new name (with namespace)
+        """
+        if node.get_dep_node().name() == new_name:
+            return
+        self.renames.append((node, new_name))
+        self.dg_mod.renameNode(node.mobject, new_name)
+
+    def execute(self):
+        """renames the planned nodes with one undo record
+        """
+        if self.renames == []:
+            return
+        dg_mod = self.dg_mod
+        # keeps the renames in execution order with the journaled records and commands around them
+        apiundo.flush()
+        dg_mod.doIt()
+        apiundo.commit(
+            undo = dg_mod.undoIt,
+            redo = dg_mod.doIt
+        )
+        apiundo.flush()
+        self.dg_mod = om2.MDGModifier()
+        self.renames = []
+
+class CreatePlan():
+    """
+    Creates nodes and their dynamic attributes in one batch with one 
+    undo record. transforms are made in an MDagModifier, dg nodes, 
+    attributes and names in an MDGModifier. attribute trees the api 
+    path doesn't cover are added with addAttr after the batch
+    """
+    """
+    Attributes:
+    dag_mod (om2.MDagModifier):
+    dg_mod (om2.MDGModifier):
+    cmd_attrs (list(tuple(om2.MObject, list(str)))): node and 
+    get_add_attr_cmd commands added with addAttr
     """
-    def __init__(self, attr, max_depth:int=-1):
+    # add_attr type -> om2.MFnData type
+    typed_attr_types = {
+        "string": om2.MFnData.kString,
+        "matrix": om2.MFnData.kMatrix,
+        "mesh": om2.MFnData.kMesh,
+        "nurbsCurve": om2.MFnData.kNurbsCurve,
+        "nurbsSurface": om2.MFnData.kNurbsSurface,
+    }
+    # add_attr type -> om2.MFnNumericData type
+    numeric_attr_types = {
+        "double": om2.MFnNumericData.kDouble,
+        "long": om2.MFnNumericData.kInt,
+        "bool": om2.MFnNumericData.kBoolean,
+    }
+    numeric_compound_attr_types = {"double2", "double3"}
+    # add_attr kwargs the api path handles
+    attr_kwargs = {"type", "parent", "multi", "enumName", "enum_name", "min", "max", "numberOfChildren"}
+
+    def __init__(self):
+        self.dag_mod = om2.MDagModifier()
+        self.dg_mod = om2.MDGModifier()
+        self.cmd_attrs = []
+
+    def add_node(self, node_type:str, name:str=None):
+        """plans a node. the node only exists once the plan is executed
+
+        Args:
+            node_type (str):
+            name (str, optional): Defaults to None.
+
+        Returns:
+            om2.MObject:
+        """
+        if _is_dag_type(node_type) and not _is_transform_type(node_type):
+            # shapes are made through the command so they get a transform
+            return Node.create_node(node_type, name).mobject
+
+        if _is_transform_type(node_type):
+            node = self.dag_mod.createNode(node_type)
+        else:
+            node = self.dg_mod.createNode(node_type)
+        if name:
+            self.dg_mod.renameNode(node, name)
+        return node
+
+    def add_attrs(self, node, add_attr_list):
+        """plans dynamic attributes on a node
+
+        Args:
+            node (Union[om2.MObject, Node]):
+            add_attr_list (list(tuple(str, dict))): attribute name and 
+            Node.add_attr kwargs. children follow their parents and 
+            compounds have their numberOfChildren
+        """
+        if len(add_attr_list) == 0:
+            return
+        if isinstance(node, Node):
+            node = node.mobject
+
+        add_attr_dict = dict(add_attr_list)
+        children = {}
+        for attr_name, kwargs in add_attr_list:
+            if "parent" in kwargs.keys():
+                children.setdefault(str(kwargs["parent"]), []).append(attr_name)
+
+        for attr_name, kwargs in add_attr_list:
+            if not self._is_api_attr(kwargs, add_attr_dict, children.get(attr_name, [])):
+                self.cmd_attrs.append((node, [get_add_attr_cmd(x, **y) for x, y in add_attr_list]))
+                return
+
+        for attr_name, kwargs in add_attr_list:
+            if "parent" not in kwargs.keys():
+                self.dg_mod.addAttribute(node, self._create_attr(attr_name, add_attr_dict, children))
+
+    def _is_api_attr(self, kwargs, add_attr_dict, child_names):
+        """whether the api path can make an attribute
+
+        Args:
+            kwargs (dict): Node.add_attr kwargs
+            add_attr_dict (dict{str, dict}): attributes planned with it
+            child_names (list(str)): names of its children
+
+        Returns:
+            bool:
+        """
+        attr_type = kwargs.get("type")
+        if attr_type in self.numeric_compound_attr_types:
+            if len(child_names) != int(attr_type[-1]):
+                return False
+        elif attr_type not in self.typed_attr_types and attr_type not in self.numeric_attr_types and \
+            attr_type not in ["compound", "message", "enum"]:
+            return False
+        # parents have to be made with their children
+        if "parent" in kwargs.keys() and str(kwargs["parent"]) not in add_attr_dict.keys():
+            return False
+        for key in kwargs:
+            if key not in self.attr_kwargs:
+                return False
+        return True
+
+    def _create_attr(self, attr_name, add_attr_dict, children):
+        """creates an attribute and its children
+
+        Args:
+            attr_name (str):
+            add_attr_dict (dict{str, dict}): attribute name to 
+            Node.add_attr kwargs
+            children (dict{str, list(str)}): attribute name to its 
+            children's names
+
+        Returns:
+            om2.MObject:
+        """
+        kwargs = add_attr_dict[attr_name]
+        attr_type = kwargs["type"]
+        child_attrs = [self._create_attr(x, add_attr_dict, children) for x in children.get(attr_name, [])]
+
+        if attr_type == "compound":
+            attr_fn = om2.MFnCompoundAttribute()
+            attr = attr_fn.create(attr_name, attr_name)
+            for child_attr in child_attrs:
+                attr_fn.addChild(child_attr)
+        elif attr_type in self.numeric_compound_attr_types:
+            attr_fn = om2.MFnNumericAttribute()
+            attr = attr_fn.create(attr_name, attr_name, *child_attrs)
+        elif attr_type in self.numeric_attr_types:
+            attr_fn = om2.MFnNumericAttribute()
+            attr = attr_fn.create(attr_name, attr_name, self.numeric_attr_types[attr_type])
+            if "min" in kwargs.keys():
+                attr_fn.setMin(kwargs["min"])
+            if "max" in kwargs.keys():
+                attr_fn.setMax(kwargs["max"])
+        elif attr_type in self.typed_attr_types:
+            attr_fn = om2.MFnTypedAttribute()
+            attr = attr_fn.create(attr_name, attr_name, self.typed_attr_types[attr_type])
+        elif attr_type == "message":
+            attr_fn = om2.MFnMessageAttribute()
+            attr = attr_fn.create(attr_name, attr_name)
+        else:
+            attr_fn = om2.MFnEnumAttribute()
+            attr = attr_fn.create(attr_name, attr_name)
+            index = -1
+            for field in kwargs.get("enumName", kwargs.get("enum_name", "")).split(":"):
+                if field == "":
+                    continue
+                if "=" in field:
+                    field, index = field.split("=", 1)
+                    index = int(index)
+                else:
+                    index += 1
+                attr_fn.addField(field, index)
+
+        if kwargs.get("multi", False):
+            attr_fn.array = True
+        return attr
+
+    def execute(self):
+        """creates the planned nodes and attributes with one undo record
+        """
+        dag_mod = self.dag_mod
+        dg_mod = self.dg_mod
+        dag_mod.doIt()
+        dg_mod.doIt()
+        def undo():
+            dg_mod.undoIt()
+            dag_mod.undoIt()
+        def redo():
+            dag_mod.doIt()
+            dg_mod.doIt()
+        apiundo.commit(
+            undo = undo,
+            redo = redo
+        )
+        # the commands editing the new nodes have to come after their creation in the undo queue
+        apiundo.flush()
+
+        for node, add_attr_cmds in self.cmd_attrs:
+            Node(node).add_attrs(add_attr_cmds)
+
+        self.dag_mod = om2.MDagModifier()
+        self.dg_mod = om2.MDGModifier()
+        self.cmd_attrs = []
+
+@functools.lru_cache(maxsize=None)
+def _get_inherited_types(node_type:str):
+    """
+    Args:
+        node_type (str):
+
+    Returns:
+        tuple(str):
+    """
+    return tuple(cmds.nodeType(node_type, isTypeName=True, inherited=True) or [])
+
+def _is_dag_type(node_type:str):
+    return "dagNode" in _get_inherited_types(node_type)
+
+def _is_transform_type(node_type:str):
+    return "transform" in _get_inherited_types(node_type)
+
+class ContainerIndex():
+    """
+    Scene wide index of container membership. built in one pass over 
+    the scene's containers and kept current through connection 
+    callbacks on the containers' hyperLayout nodes
+    """
+    """
+    Attributes:
+    parents (dict{int, om2.MObjectHandle}): member hash to container
+    members (dict{int, dict{int, om2.MObjectHandle}}): container hash to
+    its members
+    dirty (bool): rebuilt on the next query when True
+    """
+    def __init__(self):
+        self.parents = {}
+        self.members = {}
+        self.dirty = True
+
+    def set_dirty(self):
+        self.dirty = True
+
+    def rebuild(self):
+        self.parents = {}
+        self.members = {}
+        container_iter = om2.MItDependencyNodes(om2.MFn.kContainer)
+        while not container_iter.isDone():
+            container_handle = om2.MObjectHandle(container_iter.thisNode())
+            members = {}
+            for member in om2.MFnContainerNode(container_handle.object()).getMembers():
+                member_handle = om2.MObjectHandle(member)
+                members[member_handle.hashCode()] = member_handle
+                self.parents[member_handle.hashCode()] = container_handle
+            self.members[container_handle.hashCode()] = members
+            container_iter.next()
+        self.dirty = False
+
+    def _get_index(self):
+        if self.dirty:
+            self.rebuild()
+        return self
+
+    @staticmethod
+    def _get_hyper_layout_container(hyper_layout: om2.MObject):
+        """finds the container a hyperLayout belongs to 
+        (hyperLayout.message -> container.hyperLayout)
+
+        Args:
+            hyper_layout (om2.MObject):
+
+        Returns:
+            Union[om2.MObject, None]:
+        """
+        message_plug = om2.MFnDependencyNode(hyper_layout).findPlug("message", False)
+        for plug in message_plug.connectedTo(False, True):
+            if plug.node().hasFn(om2.MFn.kContainer):
+                return plug.node()
+        return None
+
+    def update_membership(self, member: om2.MObject, hyper_layout: om2.MObject, added: bool):
+        """adds or removes a member of the container using hyper_layout
+
+        Args:
+            member (om2.MObject):
+            hyper_layout (om2.MObject): hyperLayout of the container
+            added (bool):
+        """
+        if self.dirty:
+            return
+        container = self._get_hyper_layout_container(hyper_layout)
+        if container is None:
+            self.dirty = True
+            return
+        container_handle = om2.MObjectHandle(container)
+        member_handle = om2.MObjectHandle(member)
+        members = self.members.setdefault(container_handle.hashCode(), {})
+        if added:
+            members[member_handle.hashCode()] = member_handle
+            self.parents[member_handle.hashCode()] = container_handle
+        else:
+            members.pop(member_handle.hashCode(), None)
+            curr_container_handle = self.parents.get(member_handle.hashCode())
+            if curr_container_handle is not None and curr_container_handle.hashCode() == container_handle.hashCode():
+                self.parents.pop(member_handle.hashCode())
+
+    def remove_node(self, node_hash: int):
+        """removes a deleted node from the index
+
+        Args:
+            node_hash (int): MObjectHandle hash code of the node
+        """
+        if self.dirty:
+            return
+        container_handle = self.parents.pop(node_hash, None)
+        if container_handle is not None:
+            self.members.get(container_handle.hashCode(), {}).pop(node_hash, None)
+        for member_hash in self.members.pop(node_hash, {}):
+            self.parents.pop(member_hash, None)
+
+    def get_container(self, node: om2.MObject):
+        """gets the container node is a member of
+
+        Args:
+            node (om2.MObject):
+
+        Returns:
+            Union[Container, None]:
+        """
+        container_handle = self._get_index().parents.get(om2.MObjectHandle(node).hashCode())
+        if container_handle is None or not container_handle.isValid():
+            return None
+        return Container(container_handle.object())
+
+    def get_members(self, container: om2.MObject):
+        """gets the members of container
+
+        Args:
+            container (om2.MObject):
+
+        Returns:
+            list(om2.MObjectHandle):
+        """
+        members = self._get_index().members.get(om2.MObjectHandle(container).hashCode(), {})
+        return [x for x in members.values() if x.isValid()]
+
+    def get_child_containers(self, container: om2.MObject):
+        """gets the containers that are members of container
+
+        Args:
+            container (om2.MObject):
+
+        Returns:
+            list(Container):
+        """
+        members = self._get_index().members.get(om2.MObjectHandle(container).hashCode(), {})
+        return [Container(x.object()) for x in members.values() 
+                if x.isValid() and x.object().apiType() == om2.MFn.kContainer]
+
+class AttrIter():
+    """
+    Iterator for attr. Iterates depth first through the child plugs of
+    an attr (array elements and compound children) up to max depth. 
+    children are only enumerated when they're reached
+    """
+    """
+    Attributes:
+    original_attr (Attr): attr being iterated through
+    max_depth (int): max depth to stop at (and include). direct children
+    are at depth 1. negative for no limit
+    wrap (bool): returns Attr when True, om2.MPlug when False
+    leaf_only (bool): only returns plugs that aren't arrays or compounds
+    stack (list): [parent plug, next child index, child count] for each 
+    depth being iterated through
+    """
+    def __init__(self, attr, max_depth:int=-1, wrap:bool=True, leaf_only:bool=False):
         """initializes data to iterate through AttrIter
 
         Args:
             attr (Attr): starting attribute to iterate through
             max_depth (int, optional): max depth to search of attr. 
             Defaults to -1.
+            wrap (bool, optional): wrap plugs in Attr. Defaults to True.
+            leaf_only (bool, optional): skip arrays and compounds. 
+            Defaults to False.
         """
         self.__original_attr__ = attr
-        self.__current_attr__ = None
         self.__max_depth__ = max_depth
-        self.__depth__ = 0
+        self.__wrap__ = wrap
+        self.__leaf_only__ = leaf_only
+        self.__stack__ = []
+        if max_depth != 0:
+            self._push(attr.plug)
+
+    @staticmethod
+    def _child_count(plug: om2.MPlug):
+        if plug.isArray:
+            return plug.numElements()
+        elif plug.isCompound:
+            return plug.numChildren()
+        return 0
+
+    def _push(self, plug: om2.MPlug):
+        child_count = self._child_count(plug)
+        if child_count > 0:
+            self.__stack__.append([plug, 0, child_count])
 
     def _reached_max_depth(self):
-        return self.__depth__ + 1 > self.__max_depth__ and self.__max_depth__ >= 0
+        return len(self.__stack__) >= self.__max_depth__ and self.__max_depth__ >= 0
+
     def __next__(self):
         """gets next attr
 
@@ -505,49 +1576,31 @@ class AttrIter():
             StopIteration: stops the iterator
 
         Returns:
-            Attr: 
+            Union[Attr, om2.MPlug]: 
         """
-        # when to stop iteration
-        if not self.__original_attr__.has_children() and len(self.__original_attr__) > 0:
-            raise StopIteration
-        
+        while self.__stack__:
+            frame = self.__stack__[-1]
+            parent_plug, index, child_count = frame
+            if index >= child_count:
+                self.__stack__.pop()
+                continue
+            frame[1] += 1
+
+            if parent_plug.isArray:
+                plug = parent_plug.elementByLogicalIndex(index)
+            else:
+                plug = parent_plug.child(index)
 
-        
-        # to get the starting one
-        if self.__current_attr__ is None:
-            self.__current_attr__ = self.__original_attr__[0]
-            self.__depth__ += 1
-            return self.__current_attr__
-        
-        # if attr has children
-        elif self.__current_attr__.has_children() and len(self.__current_attr__) > 0 and not self._reached_max_depth():
-            self.__current_attr__ = self.__current_attr__[0]
-            self.__depth__ += 1
-            return self.__current_attr__
-        
-        # if at the end of list of attributes
-        elif self.__current_attr__.index + 1 >= len(self.__current_attr__.parent):
-            for x in range(100):
-                if self.__current_attr__.index + 1 >= len(self.__current_attr__.parent):
-                    self.__current_attr__ = self.__current_attr__.parent
-                    self.__depth__ -= 1
-                    if self.__current_attr__ == self.__original_attr__:
-                        raise StopIteration
-                    continue
+            is_leaf = not (plug.isArray or plug.isCompound)
+            if not is_leaf and not self._reached_max_depth():
+                self._push(plug)
+            if self.__leaf_only__ and not is_leaf:
+                continue
 
-            index = self.__current_attr__.index
-            parent = self.__current_attr__.parent
-            self.__current_attr__ = parent[index + 1]
-            return self.__current_attr__
-            
+            if self.__wrap__:
+                return Attr(self.__original_attr__.node, plug)
+            return plug
 
-        # go to sibling
-        elif self.__current_attr__.index + 1 < len(self.__current_attr__.parent):
-            index = self.__current_attr__.index
-            parent = self.__current_attr__.parent
-            self.__current_attr__ = parent[index + 1]
-            return self.__current_attr__
-        
         raise StopIteration
     def __iter__(self):
         """returns self as it"s iterator
@@ -557,6 +1610,161 @@ class AttrIter():
         """
         return self
     
+class PlugValue():
+    """
+    Typed value access for leaf plugs. Dispatches on the plug's
+    MFnAttribute type and reads/writes through MPlug, falling back to
+    cmds only for types it doesn't know
+    """
+    """
+    Attributes:
+    getters (dict): value type to MPlug getter
+    setters (dict): value type to MPlug setter
+    """
+    _numeric_types = {
+        om2.MFnNumericData.kBoolean:    "bool",
+        om2.MFnNumericData.kByte:       "int",
+        om2.MFnNumericData.kChar:       "int",
+        om2.MFnNumericData.kShort:      "int",
+        om2.MFnNumericData.kInt:        "int",
+        om2.MFnNumericData.kInt64:      "int",
+        om2.MFnNumericData.kFloat:      "double",
+        om2.MFnNumericData.kDouble:     "double",
+    }
+    _attribute_types = {
+        om2.MFn.kDoubleLinearAttribute: "double",
+        om2.MFn.kFloatLinearAttribute:  "double",
+        om2.MFn.kDoubleAngleAttribute:  "angle",
+        om2.MFn.kFloatAngleAttribute:   "angle",
+        om2.MFn.kEnumAttribute:         "enum",
+        om2.MFn.kMatrixAttribute:       "matrix",
+        om2.MFn.kFloatMatrixAttribute:  "matrix",
+        om2.MFn.kMessageAttribute:      "message",
+    }
+    _typed_types = {
+        om2.MFnData.kString:            "string",
+        om2.MFnData.kMatrix:            "matrix",
+    }
+
+    @staticmethod
+    def _get_string(plug: om2.MPlug):
+        # matches getAttr which returns None for a string that was never set
+        if plug.asMObject().isNull():
+            return None
+        return plug.asString()
+
+    @staticmethod
+    def _get_matrix(plug: om2.MPlug):
+        data_obj = plug.asMObject()
+        if data_obj.isNull():
+            return None
+        matrix = om2.MFnMatrixData(data_obj).matrix()
+        return [matrix[i] for i in range(16)]
+
+    @staticmethod
+    def _set_string(plug: om2.MPlug, value):
+        # matches setAttr type="string" which stores the value's str. 
+        # None (never set) is stored as empty
+        if value is None:
+            value = ""
+        elif not isinstance(value, str):
+            value = str(value)
+        plug.setString(value)
+
+    @staticmethod
+    def _set_matrix(plug: om2.MPlug, value):
+        plug.setMObject(om2.MFnMatrixData().create(om2.MMatrix(value)))
+
+    @staticmethod
+    def _set_message(plug: om2.MPlug, value):
+        raise TypeError("message attribute {} has no value".format(plug.name()))
+
+    getters = {
+        "bool":     lambda x: x.asBool(),
+        "int":      lambda x: x.asInt(),
+        "double":   lambda x: x.asDouble(),
+        "angle":    lambda x: x.asMAngle().asDegrees(),
+        "enum":     lambda x: x.asInt(),
+        "string":   lambda x: PlugValue._get_string(x),
+        "matrix":   lambda x: PlugValue._get_matrix(x),
+        "message":  lambda x: None,
+    }
+    setters = {
+        "bool":     lambda x, y: x.setBool(bool(y)),
+        "int":      lambda x, y: x.setInt(int(y)),
+        "double":   lambda x, y: x.setDouble(y),
+        "angle":    lambda x, y: x.setMAngle(om2.MAngle(y, om2.MAngle.kDegrees)),
+        "enum":     lambda x, y: x.setInt(int(y)),
+        "string":   lambda x, y: PlugValue._set_string(x, y),
+        "matrix":   lambda x, y: PlugValue._set_matrix(x, y),
+        "message":  lambda x, y: PlugValue._set_message(x, y),
+    }
+
+    @classmethod
+    def value_type(cls, plug: om2.MPlug):
+        """gets the value type of a leaf plug. returns None if the type
+        has to go through cmds
+
+        Args:
+            plug (om2.MPlug):
+
+        Returns:
+            Union[str, None]:
+        """
+        attr = plug.attribute()
+        api_type = attr.apiType()
+        if api_type == om2.MFn.kNumericAttribute:
+            return cls._numeric_types.get(om2.MFnNumericAttribute(attr).numericType())
+        if api_type == om2.MFn.kTypedAttribute:
+            return cls._typed_types.get(om2.MFnTypedAttribute(attr).attrType())
+        return cls._attribute_types.get(api_type)
+
+    @staticmethod
+    def plug_name(plug: om2.MPlug):
+        """full name of the plug usable by cmds
+
+        Args:
+            plug (om2.MPlug):
+
+        Returns:
+            str:
+        """
+        return "{}.{}".format(
+            om2.MFnDependencyNode(plug.node()).uniqueName(),
+            plug.name().split(".", 1)[1])
+
+    @classmethod
+    def get(cls, plug: om2.MPlug):
+        """gets the value of a leaf plug
+
+        Args:
+            plug (om2.MPlug):
+
+        Returns:
+        """
+        value_type = cls.value_type(plug)
+        if value_type is None:
+            return cmds.getAttr(cls.plug_name(plug))
+        return cls.getters[value_type](plug)
+
+    @classmethod
+    def set(cls, plug: om2.MPlug, value):
+        """sets the value of a leaf plug
+
+        Args:
+            plug (om2.MPlug):
+            value ():
+        """
+        value_type = cls.value_type(plug)
+        if value_type is None:
+            apiundo.run(cmds.setAttr, cls.plug_name(plug), value)
+            return
+
+        transaction = get_transaction()
+        if transaction is not None and transaction.set_plug_value(plug, value_type, value):
+            return
+        cls.setters[value_type](plug, value)
+
 class Attr():
     """
     A Class encapsulating an attribute
@@ -575,16 +1783,6 @@ class Attr():
     """
     
 
-    __attr_data_map__ = {
-        "kDoubleAngleAttribute":    {"get": lambda x: x.asMAngle().asDegrees(),     "set": lambda x, y: x.setDouble(om2.MAngle(y, 2).asRadians())},
-        "kDoubleLinearAttribute":   {"get": lambda x: x.asDouble(),                 "set": lambda x, y: x.setDouble(y)},
-        "kEnumAttribute":           {"get": lambda x: x.asInt(),                    "set": lambda x, y: x.setInt(y)},
-        #"kMatrixAttribute":         {"get": None,                                   "set": None},
-        #"kMessageAttribute":        {"get": None,                                   "set": None},
-        "kNumericAttribute":        {"get": lambda x: x.asDouble(),                 "set": lambda x, y: x.setDouble(y)},
-        #"kTypedAttribute":          {"get": None,                                   "set": None},
-    }
-    
     def __init__(self, node:Node, attr: Union[om2.MPlug, str]):
         """initializes Attr data
 
@@ -594,6 +1792,7 @@ class Attr():
             depth (int): used for iterating through Attr
         """
         self.node = node
+        self._key = None
         
         self.plug = utils.get_plug(None, attr)
         if self.plug is None:
@@ -667,12 +1866,14 @@ class Attr():
             dgMod = om2.MDGModifier()
             for connection in connection_pairs:
                 dgMod.disconnect(connection[0], connection[1])
-            dgMod.doIt()
+            with LockManager(*[x[1] for x in connection_pairs]):
+                dgMod.doIt()
         def undo(connection_pairs):
             dgMod = om2.MDGModifier()
             for connection in connection_pairs:
                 dgMod.connect(connection[0], connection[1])
-            dgMod.doIt()
+            with LockManager(*[x[1] for x in connection_pairs]):
+                dgMod.doIt()
         
         connection_pairs = []
         if children and self.has_children():
@@ -693,16 +1894,17 @@ class Attr():
         if connection_pairs == []:
             cmds.warning("nothing to disconnect from {0}".format(str(self.plug)))
             return
-        locked = self.is_locked()
-        if locked:
-            self.set_locked(False)
-        redo(connection_pairs)
-        apiundo.commit(
-            redo = lambda: redo(connection_pairs),
-            undo = lambda: undo(connection_pairs)
-        )
-        if locked:
-            self.set_locked(True)
+        transaction = get_transaction()
+        if transaction is not None:
+            with LockManager(*[x[1] for x in connection_pairs]):
+                for connection in connection_pairs:
+                    transaction.disconnect(connection[0], connection[1])
+        else:
+            redo(connection_pairs)
+            apiundo.commit(
+                redo = lambda: redo(connection_pairs),
+                undo = lambda: undo(connection_pairs)
+            )
     
     def has_source_connection(self):
         return self.is_connected()
@@ -748,41 +1950,63 @@ class Attr():
         Args:
             value ():
         """
+        transaction = get_transaction()
+        if transaction is not None or not apiundo.is_enabled():
+            # the transaction's modifier restores the previous values on
+            # undo, with undo disabled there's nothing to restore
+            if isinstance(value, Attr):
+                value = value.value
+            # a failed set only leaves compounds and arrays partly set, 
+            # so only their previous values are read
+            orig_val = None
+            if self.plug.isCompound or self.plug.isArray:
+                orig_val = self.value
+            try:
+                self._set_value(self.plug, value)
+            except:
+                if orig_val is not None:
+                    self._set_value(self.plug, orig_val)
+                cmds.warning("error occured when setting {} was not changed".format(str(self.plug)))
+            return
+
         orig_val = self.value
         def do(plug, value):
             if isinstance(value, Attr):
                 value = value.value
             self._set_value(plug, value)
+        def restore(plug):
+            # attrs that were never set have nothing to restore
+            if orig_val is not None:
+                self._set_value(plug, orig_val)
         
         try:
             do(self.plug, value)
         except ValueError:
-            self._set_value(self.plug, orig_val)
+            restore(self.plug)
             cmds.warning("set info, mismatch {} was not changed".format(str(self.plug)))
         except:
-            self._set_value(self.plug, orig_val)
+            restore(self.plug)
             cmds.warning("error occured when setting {} was not changed".format(str(self.plug)))
         
         apiundo.commit(
             redo = lambda: do(self.plug, value),
-            undo = lambda: do(self.plug, orig_val)
+            undo = lambda: restore(self.plug)
         )
     def set_locked(self, lock):
-        cmds.setAttr(str(self), lock=lock)
+        if not apiundo.is_enabled():
+            self.plug.isLocked = lock
+            return
+        apiundo.run(cmds.setAttr, str(self), lock=lock)
     def is_locked(self):
-        return cmds.getAttr(str(self), lock=True)
+        return self.plug.isLocked
     def set_keyable(self, keyable):
-        cmds.setAttr(str(self), edit=True, keyable=keyable)
+        apiundo.run(cmds.setAttr, str(self), edit=True, keyable=keyable)
     def is_keyable(self):
         return cmds.getAttr(str(self), keyable=True)
     def set_alias(self, alias):
-        cmds.aliasAttr(alias, self.name)
+        apiundo.run(cmds.aliasAttr, alias, self.name)
     def has_attr(self, sub_attr):
-        try:
-            self[sub_attr]
-            return True
-        except:
-            return False
+        return utils.get_plug(self.plug, sub_attr) is not None
     def _set_value(self, plug: om2.MPlug, value):
         """Sets value on plug. is recurrsive when plug is has children or
         elements. 
@@ -798,32 +2022,20 @@ class Attr():
             ValueError: if number of children is mismatched by length of
             value
         """
-        attr_type = cmds.getAttr(str(self), type=True)
-        locked = self.is_locked()
-        if locked:
-            self.set_locked(False)
-        if plug.isArray:
-            for index in range(len(value)):
-                curr_plug = plug.elementByLogicalIndex(index)
-                self._set_value(curr_plug, value[index])
-        elif plug.isCompound:
-            num_plug_element_list = plug.numChildren()
-            if num_plug_element_list != len(value):
-                raise ValueError()
-            for index in range(num_plug_element_list):
-                curr_plug = plug.child(index)
-                self._set_value(curr_plug, value[index])
-        elif attr_type == "string":
-            cmds.setAttr(str(self), value, type="string")
-        elif attr_type == "matrix":
-            cmds.setAttr(str(self), value, type='matrix')
-        elif self._plug_attr_type(plug) in self.__attr_data_map__.keys():
-            self.__attr_data_map__[self._plug_attr_type(plug)]["set"](plug, value)
-        else:
-            cmds.setAttr(str(self), value)
-
-        if locked:
-            self.set_locked(True)
+        with LockManager(plug):
+            if plug.isArray:
+                for index in range(len(value)):
+                    curr_plug = plug.elementByLogicalIndex(index)
+                    self._set_value(curr_plug, value[index])
+            elif plug.isCompound:
+                num_plug_element_list = plug.numChildren()
+                if num_plug_element_list != len(value):
+                    raise ValueError()
+                for index in range(num_plug_element_list):
+                    curr_plug = plug.child(index)
+                    self._set_value(curr_plug, value[index])
+            else:
+                PlugValue.set(plug, value)
 
     def _get_value(self, plug: om2.MPlug):
         """Gets value on plug. is recurrsive when plug is has children or
@@ -834,7 +2046,6 @@ class Attr():
 
         Returns:
         """
-        
         if plug.isArray:
             plug_list = [plug.elementByLogicalIndex(i) for i in range(plug.numElements())]
             plug_list = [self._get_value(x) for x in plug_list]
@@ -843,14 +2054,7 @@ class Attr():
             plug_list = [plug.child(i) for i in range(plug.numChildren())]
             plug_list = [self._get_value(x) for x in plug_list]
             return tuple(plug_list)
-        elif self._plug_attr_type(plug) in self.__attr_data_map__.keys():
-            return self.__attr_data_map__[self._plug_attr_type(plug)]["get"](plug)
-        # else:
-            # attr_type = cmds.getAttr(str(self), type=True)
-        return_value = cmds.getAttr(str(self))
-            # if attr_type == "matrix":
-            #     return_value = [return_value[i:i+4] for i in range(0, len(return_value), 4)]
-        return return_value
+        return PlugValue.get(plug)
     def __eq__(self, other):
         """Returns True if the other object is of type Attr and the 
         other's plug matches self's plug
@@ -862,11 +2066,24 @@ class Attr():
             bool: 
         """
         if isinstance(other, Attr):
-            return str(self) == str(other)
+            if self is other:
+                return True
+            return self._get_key() == other._get_key() and self.plug == other.plug
         return False
     
     def __hash__(self):
-        return hash(str(self))
+        return hash(self._get_key())
+
+    def _get_key(self):
+        """identity key of the plug (node hash, attribute hash, logical
+        indices of its array ancestors). computed on first use
+
+        Returns:
+            tuple:
+        """
+        if self._key is None:
+            self._key = get_plug_key(self.plug)
+        return self._key
     
     # Operator overloads connections and disconnections as well as get item
     def __str__(self):
@@ -886,17 +2103,8 @@ class Attr():
             other ():
         """
         if isinstance(other, Attr):
-            source_locked = self.is_locked()
-            dest_locked = other.is_locked()
-            if source_locked:
-                self.set_locked(False)
-            if dest_locked:
-                other.set_locked(False)
-            utils.connect_plugs(self.plug, other.plug)
-            if source_locked:
-                self.set_locked(True)
-            if dest_locked:
-                other.set_locked(True)
+            with LockManager(self.plug, other.plug):
+                utils.connect_plugs(self.plug, other.plug)
         else:
             cmds.error("{} not class Attr".format(other))
     def __lshift__(self, other):
@@ -908,17 +2116,8 @@ class Attr():
             other ():
         """
         if isinstance(other, Attr):
-            source_locked = other.is_locked()
-            dest_locked = self.is_locked()
-            if source_locked:
-                other.set_locked(False)
-            if dest_locked:
-                self.set_locked(False)
-            utils.connect_plugs(other.plug, self.plug)
-            if source_locked:
-                other.set_locked(True)
-            if dest_locked:
-                self.set_locked(True)
+            with LockManager(other.plug, self.plug):
+                utils.connect_plugs(other.plug, self.plug)
         else:
             cmds.error("{} not class Attr".format(other))
     def __invert__(self):
@@ -939,16 +2138,9 @@ class Attr():
         Returns:
             Attr:
         """
-        full_attr_name = self.attr_name
-        if self.plug.isArray:
-            full_attr_name = "{0}[{1}]".format(full_attr_name, attr)
-        elif self.plug.isCompound:
-            full_attr_name = "{0}.{1}".format(full_attr_name, attr)
-
-        if full_attr_name in self.node.get_attr_cache().keys():
-            return self.node.get_attr_cache()[full_attr_name]
-
         plug = utils.get_plug(self.plug, attr)
+        if plug is None:
+            raise RuntimeError("{0}.{1} attribute not found".format(str(self), attr))
         return Attr(self.node, plug)
     
     def __setitem__(self, attr: str, new_value):
@@ -3,6 +3,7 @@ import maya.cmds as cmds
 import re
 import ast
 import math
+import functools
 # import components.control_components as control_components
 import utils.enum as utils_enum
 
@@ -11,6 +12,39 @@ from typing import Union
 import utils.node_wrapper as nw
 import utils.apiundo as apiundo
 
+def get_mobject(node: Union[om2.MObject, om2.MPlug, str]):
+    """converts to a dependency node MObject using input. if none found 
+    None will be returned
+
+    Args:
+        node (Union[om2.MObject, om2.MPlug, str]): input to convert 
+        to a MObject
+
+    Returns:
+        Union[None, om2.MObject]:
+    """
+    if isinstance(node, nw.Node):
+        return node.mobject
+    if isinstance(node, om2.MFnDependencyNode):
+        return node.object()
+    if isinstance(node, om2.MObject):
+        if node.hasFn(om2.MFn.kDependencyNode):
+            return node
+        return None
+    if isinstance(node, om2.MPlug):
+        return node.node()
+    if not isinstance(node, str):
+        return None
+
+    m_sel_list = om2.MSelectionList()
+    try:
+        m_sel_list.add(node)
+    except RuntimeError:
+        cmds.error("node {0} does not exist".format(node))
+    if m_sel_list.length() > 1:
+        cmds.error("more than 1 object named {}".format(node))
+    return m_sel_list.getDependNode(0)
+
 def get_dep_node(node: Union[om2.MObject, om2.MPlug, str]):
     """converts to dependency node using input. if none found None 
     will be returned
@@ -24,29 +58,65 @@ def get_dep_node(node: Union[om2.MObject, om2.MPlug, str]):
     """
     if isinstance(node, om2.MFnDependencyNode):
         return node
-    if isinstance(node, om2.MObject):
-        if node.hasFn(om2.MFn.kDependencyNode):
-            return om2.MFnDependencyNode(node)
-    
-    # if can be added to a MSelectionList
-    m_sel_list = om2.MSelectionList()
-    if isinstance(node, str):
-        full_name = cmds.ls(node, l=True)
-        if len(full_name) > 1:
-            cmds.error("more than 1 object named {}".format(node))
-        node = full_name[0]
-    elif isinstance(node, om2.MPlug):
-        return get_dep_node(node.node())
-    elif isinstance(node, nw.Node):
+    if isinstance(node, nw.Node):
         return node.get_dep_node()
-    
-    # if not string or mplug
-    else:
+    mobject = get_mobject(node)
+    if mobject is None:
         return None
-    
-    m_sel_list.add(node)
-    dep_node = m_sel_list.getDependNode(0)
-    return om2.MFnDependencyNode(dep_node)
+    return om2.MFnDependencyNode(mobject)
+
+# compound attribute handle hash code -> (om2.MObjectHandle, {child name: child index})
+_child_index_tables = {}
+# dead entries are dropped when the cache grows past this
+_child_index_table_limit = 4096
+
+def _prune_child_index_tables():
+    """drops the tables of deleted attributes. clears the cache if it's
+    still over the limit
+    """
+    for hash_code in [x for x in _child_index_tables if not _child_index_tables[x][0].isValid()]:
+        del _child_index_tables[hash_code]
+    if len(_child_index_tables) >= _child_index_table_limit:
+        _child_index_tables.clear()
+
+def _get_child_index_table(compound_attr: om2.MObject):
+    """returns a dict of child attribute names (long and short) to child
+    index for a compound attribute. cached per attribute definition
+
+    Args:
+        compound_attr (om2.MObject): compound attribute
+
+    Returns:
+        dict{str, int}:
+    """
+    handle = om2.MObjectHandle(compound_attr)
+    cached = _child_index_tables.get(handle.hashCode())
+    if cached is not None and cached[0].isValid() and cached[0].object() == compound_attr:
+        return cached[1]
+
+    compound_fn = om2.MFnCompoundAttribute(compound_attr)
+    child_index_table = {}
+    for index in range(compound_fn.numChildren()):
+        child_fn = om2.MFnAttribute(compound_fn.child(index))
+        child_index_table.setdefault(child_fn.shortName, index)
+        child_index_table[child_fn.name] = index
+    if len(_child_index_tables) >= _child_index_table_limit:
+        _prune_child_index_tables()
+    _child_index_tables[handle.hashCode()] = (handle, child_index_table)
+    return child_index_table
+
+@functools.lru_cache(maxsize=4096)
+def parse_attr_path(attr_path: str):
+    """splits an attribute path into tokens. indices are returned as ints
+    ie. "hier[3].outputWorldMatrix" -> ("hier", 3, "outputWorldMatrix")
+
+    Args:
+        attr_path (str):
+
+    Returns:
+        tuple(Union[str, int]):
+    """
+    return tuple(int(x) if x.isdigit() else x for x in re.split(r"[.|\[|\]]", attr_path) if x != "")
 
 def get_child_plug(plug: om2.MPlug, attr: str):
     """returns the child plug of "plug" given a child attribute. 
@@ -59,19 +129,20 @@ def get_child_plug(plug: om2.MPlug, attr: str):
     Returns:
         Union[om2.MPlug, dict{str, om2.MPlug}: child MPlug
     """
-    child_plugs = [plug.child(index) for index in range(plug.numChildren())]
-    child_plugs = {x.name().rsplit(".", 1)[1]: x for x in child_plugs}
     if attr == None:
-        return child_plugs
-    if attr in child_plugs.keys():
-        return child_plugs[attr]
-    return None
+        child_plugs = [plug.child(index) for index in range(plug.numChildren())]
+        return {x.name().rsplit(".", 1)[1]: x for x in child_plugs}
+    child_index = _get_child_index_table(plug.attribute()).get(attr)
+    if child_index is None:
+        return None
+    return plug.child(child_index)
 
 def get_plug(attr_parent: Union[om2.MPlug, om2.MFnDependencyNode, str],
              attr: Union[om2.MPlug, str]): 
     """returns the given attribute as a plug. If attr_parent is 
     provided it finds the attribute under that parent (either a 
-    dependency node or another plug) as a plug
+    dependency node or another plug) as a plug. returns None if the
+    attribute isn't found
 
     Args:
         attr (Union[om2.MPlug, str]):
@@ -85,21 +156,11 @@ def get_plug(attr_parent: Union[om2.MPlug, om2.MFnDependencyNode, str],
     if isinstance(attr, om2.MPlug):
         return attr
     elif isinstance(attr_parent, om2.MPlug):
-        attr_str = str(attr)
-        curr_plug = attr_parent
-        for x in [x for x in re.split(r"[.|\[|\]]", attr_str) if x != ""]:
-            if curr_plug.isArray:
-                curr_plug = curr_plug.elementByLogicalIndex(int(x))
-            elif curr_plug.isCompound:
-                if isinstance(attr, int):
-                    curr_plug = curr_plug.child(attr)
-                else:
-                    curr_plug = get_child_plug(curr_plug, x)
-                if curr_plug is None:
-                    return None
-            else:
-                return None
-        return curr_plug
+        if isinstance(attr, int):
+            attr_path = (attr,)
+        else:
+            attr_path = parse_attr_path(str(attr))
+        return _walk_plug(attr_parent, attr_path)
     elif attr_parent == None:
         attr_parent = get_dep_node(attr)
         attr_str = attr.split(".", 1)[1]
@@ -108,11 +169,40 @@ def get_plug(attr_parent: Union[om2.MPlug, om2.MFnDependencyNode, str],
         attr_parent = get_dep_node(attr_parent)
         return get_plug(attr_parent, attr)
     elif isinstance(attr_parent, om2.MFnDependencyNode):
-        split_attr = re.split(r"[.|\[|\]]", attr, 1)
-        plug = attr_parent.findPlug(split_attr[0], False)
-        if len(split_attr) == 1:
-            return plug
-        return get_plug(plug, split_attr[1])
+        attr_path = parse_attr_path(attr)
+        if not attr_path or not attr_parent.hasAttribute(attr_path[0]):
+            return None
+        plug = attr_parent.findPlug(attr_path[0], False)
+        return _walk_plug(plug, attr_path[1:])
+
+def _walk_plug(plug: om2.MPlug, attr_path: tuple):
+    """walks down from plug along a parsed attribute path
+
+    Args:
+        plug (om2.MPlug): starting plug
+        attr_path (tuple(Union[str, int])): tokens from parse_attr_path
+
+    Returns:
+        Union[om2.MPlug, None]:
+    """
+    curr_plug = plug
+    for token in attr_path:
+        if curr_plug.isArray:
+            if not isinstance(token, int):
+                return None
+            curr_plug = curr_plug.elementByLogicalIndex(token)
+        elif curr_plug.isCompound:
+            if isinstance(token, int):
+                if token >= curr_plug.numChildren():
+                    return None
+                curr_plug = curr_plug.child(token)
+            else:
+                curr_plug = get_child_plug(curr_plug, token)
+            if curr_plug is None:
+                return None
+        else:
+            return None
+    return curr_plug
     
 def connect_plugs(src_plug: om2.MPlug, dest_plug: om2.MPlug):
         """connects source plug to destination plug
@@ -121,14 +211,27 @@ def connect_plugs(src_plug: om2.MPlug, dest_plug: om2.MPlug):
             src_plug (om2.MPlug):
             dest_plug (om2.MPlug):
         """
+        transaction = nw.get_transaction()
+        if transaction is not None:
+            try:
+                transaction.connect(src_plug, dest_plug)
+            except:
+                # the failed connect left nothing queued. the edits the 
+                # transaction made so far are committed ahead of the command
+                apiundo.flush()
+                cmds.connectAttr(str(src_plug), str(dest_plug), force=True)
+            return
+
         def redo(src_plug, dest_plug):
             dgMod = om2.MDGModifier()
             dgMod.connect(src_plug, dest_plug)
-            dgMod.doIt()
+            with nw.LockManager(src_plug, dest_plug):
+                dgMod.doIt()
         def undo(src_plug, dest_plug):
             dgMod = om2.MDGModifier()
             dgMod.disconnect(src_plug, dest_plug)
-            dgMod.doIt()
+            with nw.LockManager(src_plug, dest_plug):
+                dgMod.doIt()
         try:
             redo(src_plug, dest_plug)
             apiundo.commit(
@@ -136,7 +239,7 @@ def connect_plugs(src_plug: om2.MPlug, dest_plug: om2.MPlug):
                 undo = lambda: undo(src_plug, dest_plug)
             )
         except:
-            cmds.connectAttr(str(src_plug), str(dest_plug), force=True)
+            apiundo.run(cmds.connectAttr, str(src_plug), str(dest_plug), force=True)
 
 class Namespace:
     @classmethod
@@ -155,7 +258,8 @@ class Namespace:
     
     @classmethod
     def delete(cls, name):
-        cmds.namespace(removeNamespace=name)
+        apiundo.run(cmds.namespace, removeNamespace=name)
+        cls._remove_from_index(name)
 
     @classmethod
     def exists(cls, name):
@@ -172,15 +276,10 @@ class Namespace:
     def add_namespace(cls, namespace):
 
         # add an index at the end of a namespace
-        namespace = strip_trailing_numbers(namespace)
-        namespace_index = Namespace.get_namespace_greatest_index(namespace)
-        if namespace_index == 0:
-            Namespace._plain_rename_namespace(namespace, namespace + "1")
-            namespace = namespace + "2"
-        elif namespace_index > 0:
-            namespace = namespace + str(namespace_index + 1)
+        namespace = cls._allocate(namespace)
 
-        cmds.namespace(addNamespace=cls.strip_outer_colons(namespace))
+        apiundo.run(cmds.namespace, addNamespace=cls.strip_outer_colons(namespace))
+        cls._add_to_index(namespace)
         return namespace
 
     @classmethod
@@ -189,29 +288,61 @@ class Namespace:
         new_namespace = cls.strip_outer_colons(new_namespace)
 
         # add an index at the end of a namespace
-        new_namespace = strip_trailing_numbers(new_namespace)
-        new_namespace_index = Namespace.get_namespace_greatest_index(new_namespace)
-        if new_namespace_index == 0:
-            Namespace._plain_rename_namespace(new_namespace, new_namespace + "1")
-            new_namespace = new_namespace + "2"
-        elif new_namespace_index > 0:
-            new_namespace = new_namespace + str(new_namespace_index + 1)
+        new_namespace = cls._allocate(new_namespace)
 
         Namespace._plain_rename_namespace(old_namespace, new_namespace)
         return new_namespace
 
+    @classmethod
+    def _allocate(cls, namespace):
+        """gets the next free indexed name for namespace. if only the 
+        plain namespace exists it's renamed to index 1 and index 2 is 
+        returned
+
+        Args:
+            namespace (str):
+
+        Returns:
+            str:
+        """
+        namespace = strip_trailing_numbers(namespace)
+        namespace_index = Namespace.get_namespace_greatest_index(namespace)
+        # the index is stale if namespaces were changed outside of Namespace
+        if (namespace_index >= 0 and not cls.exists(cls._indexed_name(namespace, namespace_index))) or \
+                cls.exists(cls._indexed_name(namespace, namespace_index + 1)):
+            cls._child_index.pop(cls._split_parent(namespace)[0], None)
+            namespace_index = Namespace.get_namespace_greatest_index(namespace)
+
+        if namespace_index == 0:
+            Namespace._plain_rename_namespace(namespace, namespace + "1")
+            namespace = namespace + "2"
+        elif namespace_index > 0:
+            namespace = namespace + str(namespace_index + 1)
+        return namespace
+
+    @classmethod
+    def _indexed_name(cls, namespace, index):
+        namespace = ":{}".format(cls.strip_outer_colons(namespace))
+        if index <= 0:
+            return namespace
+        return namespace + str(index)
+
     @classmethod
     def _plain_rename_namespace(cls, old_namespace, new_namespace):
         old_namespace = cls.strip_outer_colons(old_namespace)
         new_namespace = cls.strip_outer_colons(new_namespace)
 
         if new_namespace.find(":") == -1:
-            cmds.namespace(rename=[old_namespace, new_namespace])
+            apiundo.run(cmds.namespace, rename=[old_namespace, new_namespace])
+            cls._remove_from_index(old_namespace)
+            cls._add_to_index(new_namespace)
         else:
-            new_parent, new_namespace = new_namespace.rsplit(":", 1)
+            new_parent, new_trailing_namespace = new_namespace.rsplit(":", 1)
             new_parent = cls.strip_outer_colons(new_parent)
-            new_namespace = cls.strip_outer_colons(new_namespace)
-            cmds.namespace(rename=[old_namespace, new_namespace], parent=new_parent)
+            new_trailing_namespace = cls.strip_outer_colons(new_trailing_namespace)
+            apiundo.run(cmds.namespace, rename=[old_namespace, new_trailing_namespace], parent=new_parent)
+            cls._remove_from_index(old_namespace)
+            cls._add_to_index(new_namespace)
 
     @classmethod
     def strip_outer_colons(cls, namespace):
@@ -223,31 +354,96 @@ class Namespace:
     
     @classmethod
     def get_namespace_greatest_index(cls, namespace):
+        """gets the greatest index used by namespace (without trailing 
+        numbers) under its parent. -1 if the namespace isn't used, 0 if 
+        only the plain namespace exists
+
+        Args:
+            namespace (str):
+
+        Returns:
+            int:
+        """
         namespace = Namespace.strip_outer_colons(namespace)
-        namespace = re.sub(r'\d+$', '', namespace)
+        namespace = strip_trailing_numbers(namespace)
+        parent_namespace, base_name = cls._split_parent(namespace)
 
-        if namespace.find(":") >= 0:
-            parent_namespace = namespace.rsplit(":", 1)[0]
-        else:
-            parent_namespace = ":"
-        
-        cmds.namespace(setNamespace=parent_namespace)
-        children_namespaces = cmds.namespaceInfo(listOnlyNamespaces=True)
-        cmds.namespace(setNamespace=":")
-        if children_namespaces is None:
+        indices = cls._get_child_index(parent_namespace).get(base_name)
+        if not indices:
             return -1
-        
-        children_namespaces = [x for x in children_namespaces if x.startswith(namespace)]
-        children_index = [x.split(namespace)[-1] for x in children_namespaces]
+        return max(indices)
 
-        if children_index == []:
-            return -1
+    # parent namespace -> {base name: set(indices)} of its child namespaces
+    # plain base names are index 0
+    _child_index = {}
 
-        if len(children_index) == 1 and children_index[0] == "":
-            return 0
-        else:
-            children_index = [int(x) for x in children_index if bool(re.match(r'^\d+$', x))]
-            return max(children_index)
+    @classmethod
+    def reset_index(cls):
+        cls._child_index = {}
+
+    @classmethod
+    def _split_parent(cls, namespace):
+        """splits namespace into parent namespace and trailing name
+
+        Args:
+            namespace (str):
+
+        Returns:
+            tuple(str, str):
+        """
+        namespace = cls.strip_outer_colons(namespace)
+        if namespace.find(":") >= 0:
+            return tuple(namespace.rsplit(":", 1))
+        return ":", namespace
+
+    @classmethod
+    def _split_index(cls, name):
+        base_name = strip_trailing_numbers(name)
+        index = name[len(base_name):]
+        return base_name, int(index) if index != "" else 0
+
+    @classmethod
+    def _get_child_index(cls, parent_namespace):
+        """gets the child index of a parent namespace. seeded from 
+        namespaceInfo the first time it's used
+
+        Args:
+            parent_namespace (str):
+
+        Returns:
+            dict{str, set(int)}:
+        """
+        if parent_namespace not in cls._child_index:
+            child_index = {}
+            children_namespaces = None
+            if parent_namespace == ":":
+                children_namespaces = cmds.namespaceInfo(":", listOnlyNamespaces=True)
+            elif cls.exists(":{}".format(parent_namespace)):
+                children_namespaces = cmds.namespaceInfo(":{}".format(parent_namespace), listOnlyNamespaces=True)
+            for child_namespace in children_namespaces or []:
+                base_name, index = cls._split_index(child_namespace.rsplit(":", 1)[-1])
+                child_index.setdefault(base_name, set()).add(index)
+            cls._child_index[parent_namespace] = child_index
+        return cls._child_index[parent_namespace]
+
+    @classmethod
+    def _add_to_index(cls, namespace):
+        parent_namespace, name = cls._split_parent(namespace)
+        if parent_namespace not in cls._child_index:
+            return
+        base_name, index = cls._split_index(name)
+        cls._child_index[parent_namespace].setdefault(base_name, set()).add(index)
+
+    @classmethod
+    def _remove_from_index(cls, namespace):
+        namespace = cls.strip_outer_colons(namespace)
+        parent_namespace, name = cls._split_parent(namespace)
+        if parent_namespace in cls._child_index:
+            base_name, index = cls._split_index(name)
+            cls._child_index[parent_namespace].get(base_name, set()).discard(index)
+        # children are reseeded when they're next used
+        for child_parent in [x for x in cls._child_index if x == namespace or x.startswith(namespace + ":")]:
+            cls._child_index.pop(child_parent)
 
 def get_is_locked_and_unlock_attr(attr):
     state = attr.is_locked()
@@ -297,6 +493,7 @@ def get_trailing_numbers(input_string):
     else:
         return ""
 
+@functools.lru_cache(maxsize=1024)
 def camel_to_snake(camel_str):
     # Find all instances where a lowercase letter is followed by an uppercase letter
     # and insert an underscore between them, then convert to lowercase
@@ -307,6 +504,7 @@ def camel_to_snake(camel_str):
         snake_str = snake_str.replace("i_k", "ik")
     return snake_str
 
+@functools.lru_cache(maxsize=1024)
 def snake_to_camel(snake_str):
     # Split the string by underscores
     if snake_str.find("fk") > 0:
@@ -318,6 +516,42 @@ def snake_to_camel(snake_str):
     camel_case_str = components[0] + ''.join(x.title() for x in components[1:])
     return camel_case_str
 
+_kwarg_key_part_pattern = re.compile(r"\d+|\D+")
+
+@functools.lru_cache(maxsize=1024)
+def kwarg_key_to_attr_path(key):
+    """translates a kwarg key into an attribute path. "__" separates
+    attributes and numbers are indices
+    ie. "hier0__input_world_matrix" -> "hier[0].inputWorldMatrix"
+
+    Args:
+        key (str):
+
+    Returns:
+        str:
+    """
+    attr_name = snake_to_camel(key.replace("__", "."))
+    # the first character always belongs to the first name
+    attr_path = attr_name[:1]
+    for match in _kwarg_key_part_pattern.finditer(attr_name, 1):
+        part = match.group()
+        if match.start() == 1:
+            attr_path += part
+            continue
+        if part.isdigit():
+            attr_path = "{}[{}]".format(attr_path.rstrip("."), part)
+            continue
+        # names after an index start lowercase (unless it's the last character)
+        if match.start() + 1 < len(attr_name):
+            part = part[0].lower() + part[1:]
+        if attr_path.endswith("]"):
+            part = part.lstrip(".")
+            if part == "":
+                continue
+            part = "." + part
+        attr_path += part
+    return attr_path.rstrip(".")
+
 def convert_kwarg_data(kwargs):
     if isinstance(kwargs, nw.Attr):
         kwargs = kwargs.value
@@ -472,11 +706,11 @@ def attach_locators_to_output_hier(component, local_matrix=False, local_rotation
 def create_locators(num_locators, parented=False, local_rotation_axis=False):
     locators = []
     for i in range(num_locators):
-        locators.append(nw.Node(cmds.spaceLocator()[0]))
+        locators.append(nw.Node(apiundo.run(cmds.spaceLocator)[0]))
         if local_rotation_axis:
-            cmds.toggle(str(locators[-1]), localAxis=True)
+            apiundo.run(cmds.toggle, str(locators[-1]), localAxis=True)
         if i > 0 and parented:
-            cmds.parent(str(locators[-1]), str(locators[-2]))
+            apiundo.run(cmds.parent, str(locators[-1]), str(locators[-2]))
 
     return locators
 